@@ -39,7 +39,7 @@ EXPECTED OUTPUT:
 recordings/
   20251028_HHMMSS/
     recording.wav ✅
-    events.json ✅
+    events.ndjson ✅
     transcripts/ ✅
       transcript_20251028_HHMMSS.txt ✅
     screenshots/
@@ -0,0 +1,243 @@
+"""
+Action memory: reuse earlier LLM analyses for workflows that share actions.
+
+ActTree is a trie over normalized action descriptions. Every analyzed workflow
+stores its analysis on the node for its full action sequence, so a later
+workflow that starts with the same actions (Win+R -> type app -> Enter ...)
+can pass that analysis to the model as prior context and only list the
+actions that differ.
+
+ActChain goes one step further for workflows that only differ in what was
+typed: the analysis is stored as a template keyed on the invariant skeleton
+(typed values replaced by <PARAM_i>, plus the windows and spoken transcripts)
+and filled in locally on a match.
+
+Usage:
+    tree = ActTree.load("clean_workflows/.cache/acttree.pkl")
+    k, prior = tree.longest_prefix(actions)
+    ...
+    tree.insert(actions, analysis)
+    tree.save("clean_workflows/.cache/acttree.pkl")
+"""
+
+import os
+import re
+import pickle
+import hashlib
+
+# Clock times, session ids (20251027_082338) and ISO timestamps carry no meaning
+# for the task itself and would otherwise prevent any two workflows from matching
+_TIMESTAMP_RE = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}[T ][\d:.]+\b|\b\d{8}_\d{6}\b|\b\d{1,2}:\d{2}(?::\d{2})?\b"
+)
+
+
+def normalize_action(action):
+    """Return the trie key for one action: lowercased description without timestamps."""
+    desc = action.get("description", "") if isinstance(action, dict) else str(action)
+    desc = _TIMESTAMP_RE.sub("", desc.lower())
+    return " ".join(desc.split())
+
+
+def _load_pickle(cls, path):
+    try:
+        with open(path, "rb") as f:
+            obj = pickle.load(f)
+        if isinstance(obj, cls):
+            return obj
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+    return cls()
+
+
+def _save_pickle(obj, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+class _Node:
+    __slots__ = ("children", "summary")
+
+    def __init__(self):
+        self.children = {}
+        self.summary = None
+
+
+class ActTree:
+    """Prefix tree of action sequences with cached analyses on their end nodes."""
+
+    def __init__(self):
+        self.root = _Node()
+
+    def longest_prefix(self, actions, max_len=None):
+        """
+        Find the longest prefix of actions that ends at an analyzed workflow.
+        Returns (k, summary), or (0, None) if no stored workflow is a prefix.
+        """
+        if max_len is None:
+            max_len = len(actions)
+        node = self.root
+        best_k, best_summary = 0, None
+        for i, action in enumerate(actions[:max_len], 1):
+            node = node.children.get(normalize_action(action))
+            if node is None:
+                break
+            if node.summary is not None:
+                best_k, best_summary = i, node.summary
+        return best_k, best_summary
+
+    def insert(self, actions, summary):
+        """Store summary as the analysis of the whole action sequence."""
+        if not actions:
+            return
+        node = self.root
+        for action in actions:
+            key = normalize_action(action)
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Node()
+            node = child
+        node.summary = summary
+
+    @classmethod
+    def load(cls, path):
+        """Load a pickled tree, or start an empty one if missing/unreadable."""
+        return _load_pickle(cls, path)
+
+    def save(self, path):
+        """Atomically pickle the tree to path."""
+        _save_pickle(self, path)
+
+
+# "Typed: 'a'" (one key) and "Typed text: 'hello'" (a whole string) carry the
+# variable part of a workflow; everything else is treated as invariant
+_TYPED_RE = re.compile(r"^\s*Typed(?: text)?:\s*'(.*)'\s*$", re.DOTALL)
+_PLACEHOLDER_RE = re.compile(r"<PARAM_(\d+)>")
+
+# Shorter values are too likely to match unrelated words in the analysis
+MIN_PARAM_LEN = 3
+
+
+def skeletonize(actions):
+    """
+    Split actions into an invariant skeleton and the typed values.
+    Consecutive typed keys are joined into one parameter, so typing "notepad"
+    key by key and typing "calc" both become a single "typed <PARAM_i>" step.
+    Returns (skeleton_tuple, params_list).
+    """
+    skeleton, params = [], []
+    run = None
+    for action in actions:
+        desc = action.get("description", "") if isinstance(action, dict) else str(action)
+        m = _TYPED_RE.match(desc)
+        if m:
+            if run is None:
+                run = []
+            run.append(m.group(1))
+            continue
+        if run is not None:
+            skeleton.append(f"typed <PARAM_{len(params)}>")
+            params.append("".join(run))
+            run = None
+        skeleton.append(normalize_action(desc))
+    if run is not None:
+        skeleton.append(f"typed <PARAM_{len(params)}>")
+        params.append("".join(run))
+    return tuple(skeleton), params
+
+
+def fill_template(template, params):
+    """Substitute params into a template's <PARAM_i> placeholders."""
+    return _PLACEHOLDER_RE.sub(lambda m: params[int(m.group(1))], template)
+
+
+def make_template(summary, params):
+    """
+    Turn an analysis into a template by replacing each typed value with its
+    placeholder. Returns None when the analysis can't be reused safely: no
+    value appears in it, or a value too short to replace reliably does.
+    """
+    template = summary
+    replaced = False
+    # longest first, so "notepad" doesn't eat the start of "notepad++"
+    for i in sorted(range(len(params)), key=lambda i: len(params[i]), reverse=True):
+        value = params[i]
+        if not value.strip():
+            continue
+        pattern = re.compile(r"(?<!\w)" + re.escape(value) + r"(?!\w)", re.IGNORECASE)
+        if len(value.strip()) < MIN_PARAM_LEN:
+            if pattern.search(template):
+                return None
+            continue
+        template, n = pattern.subn(f"<PARAM_{i}>", template)
+        replaced = replaced or n > 0
+    return template if replaced else None
+
+
+def _context(actions):
+    """
+    The parts of a workflow besides its steps that the analysis depends on:
+    the windows it ran in (consecutive repeats once) and what was said.
+    """
+    windows, transcripts = [], {}
+    for action in actions:
+        if not isinstance(action, dict):
+            continue
+        window = action.get("window") or ""
+        if not windows or windows[-1] != window:
+            windows.append(window)
+        transcripts.update(dict.fromkeys(action.get("transcripts") or ()))
+    return windows, list(transcripts)
+
+
+class ActChain:
+    """
+    Analyses keyed on the invariant skeleton of a workflow. Two recordings that
+    differ only in what was typed share a skeleton, so the stored template is
+    filled with the new values instead of asking the model again. Windows and
+    transcripts are part of the key: the same steps in another app, or with
+    different narration, are a different workflow.
+    """
+
+    def __init__(self):
+        self.templates = {}
+
+    @staticmethod
+    def _key(skeleton, actions):
+        windows, transcripts = _context(actions)
+        text = "\x1e".join(("\n".join(skeleton), "\n".join(windows), "\n".join(transcripts)))
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def lookup(self, actions):
+        """Return the filled-in analysis for actions, or None on a miss."""
+        skeleton, params = skeletonize(actions)
+        entry = self.templates.get(self._key(skeleton, actions))
+        if entry is None:
+            return None
+        template, n_params = entry
+        if n_params != len(params):
+            return None
+        return fill_template(template, params)
+
+    def insert(self, actions, summary):
+        """Store summary as a template for every workflow sharing this skeleton."""
+        skeleton, params = skeletonize(actions)
+        if not params:
+            return False  # nothing variable - the exact response cache covers it
+        template = make_template(summary, params)
+        if template is None:
+            return False
+        self.templates[self._key(skeleton, actions)] = (template, len(params))
+        return True
+
+    @classmethod
+    def load(cls, path):
+        """Load pickled templates, or start empty if missing/unreadable."""
+        return _load_pickle(cls, path)
+
+    def save(self, path):
+        """Atomically pickle the templates to path."""
+        _save_pickle(self, path)
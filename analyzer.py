@@ -3,7 +3,7 @@
 Analyzer module (refactored).
 
 Provides:
-- analyze_session(session_dir, out_dir=WORKFLOWS, use_whisper=False)
+- analyze_session(session_dir, out_dir=WORKFLOWS, use_vosk=False, use_whisper=False)
     -> returns workflow dict and writes workflows/workflow_<session>.json
 
 - analyze_latest(recordings_dir=RECORDINGS)
@@ -13,7 +13,7 @@ Provides:
 Improvements vs the simple script:
 - OCR caching per screenshot (avoids re-run)
 - Graceful errors on missing files / unreadable images
-- Optional Whisper model loaded once
+- Optional Vosk or faster-whisper model loaded once per process
 - Returns workflow dict for programmatic use
 """
 import os
@@ -21,8 +21,20 @@ import json
 import cv2
 import time
 import pytesseract
+from bisect import bisect_right
 from datetime import datetime
 from collections import defaultdict
+from event_journal import events_to_wall
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import numpy as np
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Config
 RECORDINGS = "recordings"
@@ -79,13 +91,156 @@ def _ensure_vosk(model_path="models/vosk-model-small-en-us-0.15"):
         return None
 
 
-def _safe_imread(path):
+# faster-whisper initialization (optional, used instead of Vosk when requested)
+WHISPER_MODEL = "small.en"
+WHISPER_DEVICE = "cpu"  # "cuda" to run on a GPU
+WHISPER_BATCH_SIZE = 16
+WHISPER_CPU_THREADS = max(1, (os.cpu_count() or 2) // 2)
+_whisper_pipeline = None
+
+def _ensure_whisper(model_size=WHISPER_MODEL, device=WHISPER_DEVICE):
+    """Load the faster-whisper model once and wrap it in a batched pipeline."""
+    global _whisper_pipeline
+    if _whisper_pipeline is not None:
+        return _whisper_pipeline
+
     try:
-        img = cv2.imread(path)
+        from faster_whisper import WhisperModel, BatchedInferencePipeline
+
+        # int8 weights: CTranslate2 runs int8 GEMM kernels (VNNI/AVX512) on CPU,
+        # and keeps activations in fp16 on the GPU
+        if device == "cuda":
+            model = WhisperModel(model_size, device="cuda", compute_type="int8_float16")
+        else:
+            model = WhisperModel(model_size, device="cpu", compute_type="int8",
+                                 cpu_threads=WHISPER_CPU_THREADS)
+        _whisper_pipeline = BatchedInferencePipeline(model=model)
+        return _whisper_pipeline
+    except Exception as e:
+        print(f"Failed to load faster-whisper: {e}")
+        _whisper_pipeline = None
+        return None
+
+
+# Change-region OCR: consecutive screenshots are diffed and only the changed
+# bounding box is re-OCRed while it stays below this fraction of the frame
+OCR_DIFF_THRESHOLD = 20
+OCR_CROP_MAX_FRACTION = 0.5
+OCR_CROP_PADDING = 8
+
+def _safe_imread(path, flags=cv2.IMREAD_COLOR):
+    try:
+        img = cv2.imread(path, flags)
         return img
     except Exception:
         return None
 
+def _load_ocr_gray(path):
+    """Decode a screenshot straight to one gray channel for OCR."""
+    # tesseract never sees color, so skip the BGR decode entirely
+    return _safe_imread(path, cv2.IMREAD_GRAYSCALE)
+
+def _ocr_lines(gray):
+    """
+    OCR a gray image and return its text lines as (x0, y0, x1, y1, text)
+    tuples so that lines from unchanged regions can be reused across frames.
+    """
+    try:
+        data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT)
+    except Exception as e:
+        print(f"[OCR Error] {e}")
+        return []
+
+    lines = {}
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        if not word:
+            continue
+        x, y = data["left"][i], data["top"][i]
+        x1, y1 = x + data["width"][i], y + data["height"][i]
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        line = lines.get(key)
+        if line is None:
+            lines[key] = [x, y, x1, y1, [word]]
+        else:
+            line[0], line[1] = min(line[0], x), min(line[1], y)
+            line[2], line[3] = max(line[2], x1), max(line[3], y1)
+            line[4].append(word)
+    return [(x0, y0, x1, y1, " ".join(words)) for x0, y0, x1, y1, words in lines.values()]
+
+def _lines_to_text(lines):
+    return "\n".join(line[4] for line in sorted(lines, key=lambda l: (l[1], l[0])))
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _diff_bbox_kernel(prev, cur, thresh):
+        """One pass over both frames: per-row changed span, then reduce to a box."""
+        h, w = cur.shape
+        row_x0 = np.full(h, w, np.int64)
+        row_x1 = np.full(h, -1, np.int64)
+        for y in prange(h):
+            for x in range(w):
+                if abs(np.int16(cur[y, x]) - np.int16(prev[y, x])) > thresh:
+                    if row_x0[y] == w:
+                        row_x0[y] = x
+                    row_x1[y] = x
+        x0, y0, x1, y1 = w, -1, -1, -1
+        for y in range(h):
+            if row_x1[y] >= 0:
+                if y0 < 0:
+                    y0 = y
+                y1 = y
+                x0 = min(x0, row_x0[y])
+                x1 = max(x1, row_x1[y])
+        return x0, y0, x1, y1
+
+_kernels_warm = False
+
+def _warm_kernels():
+    """Compile the Numba kernels up front instead of on the first real frame."""
+    global _kernels_warm
+    if NUMBA_AVAILABLE and not _kernels_warm:
+        dummy = np.zeros((2, 2), np.uint8)
+        _diff_bbox_kernel(dummy, dummy, OCR_DIFF_THRESHOLD)
+        _kernels_warm = True
+
+def _change_bbox(prev_gray, gray, thresh=OCR_DIFF_THRESHOLD):
+    """Return the (x0, y0, x1, y1) box of pixels that changed, or None if none did."""
+    if NUMBA_AVAILABLE:
+        x0, y0, x1, y1 = _diff_bbox_kernel(prev_gray, gray, thresh)
+        if y0 < 0:
+            return None
+        x, y, w, h = x0, y0, x1 - x0 + 1, y1 - y0 + 1
+    else:
+        diff = cv2.absdiff(gray, prev_gray)
+        _, mask = cv2.threshold(diff, thresh, 255, cv2.THRESH_BINARY)
+        points = cv2.findNonZero(mask)
+        if points is None:
+            return None
+        x, y, w, h = cv2.boundingRect(points)
+    pad = OCR_CROP_PADDING
+    return (max(x - pad, 0), max(y - pad, 0),
+            min(x + w + pad, gray.shape[1]), min(y + h + pad, gray.shape[0]))
+
+def _widen_to_lines(bbox, lines):
+    """
+    Grow bbox until no line in lines straddles its edge. A line that only
+    partly overlaps the change box must be re-OCRed whole, or the part of it
+    outside the box would be lost (and never re-read, since it won't change).
+    """
+    x0, y0, x1, y1 = bbox
+    changed = True
+    while changed:
+        changed = False
+        for lx0, ly0, lx1, ly1, _ in lines:
+            if lx1 <= x0 or lx0 >= x1 or ly1 <= y0 or ly0 >= y1:
+                continue  # disjoint: kept as is
+            if lx0 < x0 or ly0 < y0 or lx1 > x1 or ly1 > y1:
+                x0, y0 = min(x0, lx0), min(y0, ly0)
+                x1, y1 = max(x1, lx1), max(y1, ly1)
+                changed = True
+    return x0, y0, x1, y1
+
 def ocr_image(path, ocr_cache=None):
     """
     Read image at path, run OCR with Tesseract, and return text.
@@ -101,15 +256,14 @@ def ocr_image(path, ocr_cache=None):
     if path in ocr_cache:
         return ocr_cache[path]
 
-    img = _safe_imread(path)
-    if img is None:
+    gray = _load_ocr_gray(path)
+    if gray is None:
         ocr_cache[path] = ""
         return ""
     
     text = ""
     try:
         # Use Tesseract
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         text = pytesseract.image_to_string(gray).strip()
     except Exception as e:
         print(f"[OCR Error] {e}")
@@ -118,6 +272,13 @@ def ocr_image(path, ocr_cache=None):
     ocr_cache[path] = text
     return text
 
+def _save_transcript(path, text, transcripts_dir):
+    timestamp = datetime.fromtimestamp(os.path.getctime(path)).strftime('%Y%m%d_%H%M%S')
+    trans_file = os.path.join(transcripts_dir, f"transcript_{timestamp}.txt")
+    with open(trans_file, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"\033[36m[Info]\033[0m Saved transcript to {trans_file}")
+
 def transcribe_audio(path, use_vosk=False, model_path="models/vosk-model-small-en-us-0.15", session_dir=None):
     """
     Transcribe audio using Vosk.
@@ -170,11 +331,7 @@ def transcribe_audio(path, use_vosk=False, model_path="models/vosk-model-small-e
         
         # Save transcription if session_dir is provided
         if transcripts_dir:
-            timestamp = datetime.fromtimestamp(os.path.getctime(path)).strftime('%Y%m%d_%H%M%S')
-            trans_file = os.path.join(transcripts_dir, f"transcript_{timestamp}.txt")
-            with open(trans_file, "w", encoding="utf-8") as f:
-                f.write(full_transcript)
-            print(f"\033[36m[Info]\033[0m Saved transcript to {trans_file}")
+            _save_transcript(path, full_transcript, transcripts_dir)
         
         return full_transcript
         
@@ -182,34 +339,123 @@ def transcribe_audio(path, use_vosk=False, model_path="models/vosk-model-small-e
         print(f"Transcription failed: {e}")
         return f"[audio:{os.path.basename(path)}]"
 
+def transcribe_many(paths, use_whisper=False, use_vosk=False,
+                    model_path="models/vosk-model-small-en-us-0.15", session_dir=None):
+    """
+    Transcribe all audio files of a session in one go and return their texts
+    in the same order as paths.
+
+    With use_whisper the faster-whisper model is loaded once and every file is
+    run through the batched pipeline; otherwise each file goes through
+    transcribe_audio (Vosk or placeholder).
+    """
+    if not use_whisper:
+        return [transcribe_audio(p, use_vosk=use_vosk, model_path=model_path, session_dir=session_dir)
+                for p in paths]
+
+    pipeline = _ensure_whisper()
+    if pipeline is None:
+        return [f"[audio:{os.path.basename(p)}]" for p in paths]
+
+    transcripts_dir = None
+    if session_dir:
+        transcripts_dir = os.path.join(session_dir, "transcripts")
+        os.makedirs(transcripts_dir, exist_ok=True)
+
+    texts = []
+    for path in paths:
+        try:
+            segments, _info = pipeline.transcribe(path, batch_size=WHISPER_BATCH_SIZE)
+            transcription = []
+            for seg in segments:
+                trans_text = seg.text.strip()
+                if trans_text:
+                    transcription.append(trans_text)
+                    print(f"\033[32m[Audio]\033[0m {trans_text}")
+
+            full_transcript = " | ".join(transcription)
+            if not full_transcript:
+                full_transcript = f"[no speech detected in {os.path.basename(path)}]"
+            if transcripts_dir:
+                _save_transcript(path, full_transcript, transcripts_dir)
+            texts.append(full_transcript)
+        except Exception as e:
+            print(f"Transcription failed: {e}")
+            texts.append(f"[audio:{os.path.basename(path)}]")
+    return texts
+
 # -------------------
 # Core analyzer API
 # -------------------
+def _read_events(session_dir):
+    """
+    Read the recorder's events.ndjson (one event per line), falling back to the
+    legacy events.json array written by older recorder versions.
+
+    Timestamps are returned as epoch seconds (see event_journal.events_to_wall).
+    """
+    ndjson_path = os.path.join(session_dir, "events.ndjson")
+    if os.path.exists(ndjson_path):
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(ndjson_path, "rb") as f:
+            events = [loads(line) for line in f if line.strip()]
+        return events_to_wall(events)
+
+    legacy_path = os.path.join(session_dir, "events.json")
+    if os.path.exists(legacy_path):
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    raise FileNotFoundError(f"events.ndjson not found in {session_dir}")
+
 def load_session(session_dir):
     """
-    Load events.json and precompute OCR for screenshots.
+    Load the session's events and precompute OCR for screenshots.
     Returns (events, ocr_cache)
     
     Args:
         session_dir: Path to recording session directory
     """
-    events_path = os.path.join(session_dir, "events.json")
-    if not os.path.exists(events_path):
-        raise FileNotFoundError(f"events.json not found in {session_dir}")
-
-    with open(events_path, "r", encoding="utf-8") as f:
-        events = json.load(f)
+    events = _read_events(session_dir)
 
     # Collect screenshots (including window_change events which have screenshots)
     # Note: window_change events provide context but won't create workflow steps
     screenshots = [e for e in events if e.get("type") in ("screenshot", "window_change")]
     screenshots.sort(key=lambda e: e.get("ts", 0))
     ocr_cache = {}
+    prev_gray, prev_lines = None, None
+    _warm_kernels()
     for s in screenshots:
         fp = s.get("file")
-        if fp and os.path.exists(fp):
-            # lightweight - only OCR each screenshot once
-            ocr_image(fp, ocr_cache=ocr_cache)
+        # lightweight - only OCR each screenshot once
+        if not fp or fp in ocr_cache or not os.path.exists(fp):
+            continue
+
+        gray = _load_ocr_gray(fp)
+        if gray is None:
+            ocr_cache[fp] = ""
+            prev_gray, prev_lines = None, None
+            continue
+
+        # Diff against the previous frame and only OCR what changed
+        lines = None
+        if prev_gray is not None and prev_gray.shape == gray.shape:
+            bbox = _change_bbox(prev_gray, gray)
+            if bbox is None:
+                lines = prev_lines
+            else:
+                x0, y0, x1, y1 = _widen_to_lines(bbox, prev_lines)
+                if (x1 - x0) * (y1 - y0) < OCR_CROP_MAX_FRACTION * gray.size:
+                    kept = [l for l in prev_lines
+                            if l[2] <= x0 or l[0] >= x1 or l[3] <= y0 or l[1] >= y1]
+                    fresh = [(lx0 + x0, ly0 + y0, lx1 + x0, ly1 + y0, t)
+                             for lx0, ly0, lx1, ly1, t in _ocr_lines(gray[y0:y1, x0:x1])]
+                    lines = kept + fresh
+        if lines is None:
+            lines = _ocr_lines(gray)
+
+        ocr_cache[fp] = _lines_to_text(lines)
+        prev_gray, prev_lines = gray, lines
     return events, ocr_cache
 
 def heuristics_segment(events, ocr_cache):
@@ -221,16 +467,22 @@ def heuristics_segment(events, ocr_cache):
     """
     steps = []
     idx = 0
+
+    # Screenshots (including window_change ones) sorted by time so the latest
+    # one before each event is found by binary search instead of a full scan
+    snaps = sorted((s for s in events if s.get("type") in ("screenshot", "window_change")),
+                   key=lambda s: s.get("ts", 0))
+    snap_ts = [s.get("ts", 0) for s in snaps]
+
     for e in events:
         # Exclude window_change from creating steps, but include it in screenshot lookups
         if e.get("type") in ("mouse_click", "key_down"):
             # find latest screenshot before this event (including window_change screenshots)
-            snaps = [s for s in events if s.get("type") in ("screenshot", "window_change") and s.get("ts", 0) <= e.get("ts", 0)]
-            snap = snaps[-1]["file"] if snaps else None
+            i = bisect_right(snap_ts, e.get("ts", 0))
+            snap = snaps[i - 1].get("file") if i else None
             
-            # Build cache key for OCR lookup
-            cache_keys = [k for k in ocr_cache.keys() if snap and k.startswith(snap)]
-            ocr_text = ocr_cache.get(cache_keys[0], "") if cache_keys else ""
+            # OCR results are keyed by screenshot path
+            ocr_text = ocr_cache.get(snap, "") if snap else ""
             
             # Extract window title from event details
             window_title = e.get("window_title", "")
@@ -255,7 +507,8 @@ def summarize_workflow(steps):
     last = (steps[-1].get("ocr_text","") or "")[:120].replace("\n"," ")
     return f"Workflow of {len(steps)} steps. Starts near: '{first}' and ends near: '{last}'."
 
-def analyze_session(session_dir, out_dir=WORKFLOWS, use_vosk=False, model_path="models/vosk-model-small-en-us-0.15"):
+def analyze_session(session_dir, out_dir=WORKFLOWS, use_vosk=False, model_path="models/vosk-model-small-en-us-0.15",
+                    use_whisper=False):
     """
     Analyze a single recording session directory and produce workflow JSON.
     Returns the workflow dict.
@@ -265,6 +518,7 @@ def analyze_session(session_dir, out_dir=WORKFLOWS, use_vosk=False, model_path="
         out_dir: Output directory for workflow JSON
         use_vosk: Enable Vosk transcription
         model_path: Path to Vosk model
+        use_whisper: Transcribe with faster-whisper instead of Vosk
     """
     print(f"\033[36m[Info]\033[0m Analyzing session in {session_dir}")
     print(f"\033[36m[Info]\033[0m Using Tesseract for text extraction")
@@ -282,15 +536,16 @@ def analyze_session(session_dir, out_dir=WORKFLOWS, use_vosk=False, model_path="
     
     steps = heuristics_segment(events, ocr_cache)
 
-    # transcribe the complete audio recording
-    audio_events = [e for e in events if e.get("type") == "audio_recording"]
+    # transcribe all audio recordings of the session in one batch
+    audio_events = [e for e in events if e.get("type") == "audio_recording"
+                    and e.get("file") and os.path.exists(e["file"])]
     if audio_events:
-        audio_event = audio_events[0]  # There should be only one complete recording
-        audio_path = audio_event.get("file")
-        if audio_path and os.path.exists(audio_path):
-            print(f"\033[36m[Info]\033[0m Transcribing audio recording ({audio_event.get('duration', 0):.1f} seconds)...")
-            txt = transcribe_audio(audio_path, use_vosk=use_vosk, model_path=model_path, session_dir=session_dir)
-            # Add transcription to all steps as a complete recording
+        total = sum(e.get("duration", 0) for e in audio_events)
+        print(f"\033[36m[Info]\033[0m Transcribing audio recording ({total:.1f} seconds)...")
+        texts = transcribe_many([e["file"] for e in audio_events], use_whisper=use_whisper,
+                                use_vosk=use_vosk, model_path=model_path, session_dir=session_dir)
+        # Add transcription to all steps as a complete recording
+        for txt in texts:
             for s in steps:
                 s.setdefault("transcripts", []).append(txt)
     
@@ -353,6 +608,7 @@ if __name__ == "__main__":
     parser.add_argument("--vosk", action="store_true", help="Use Vosk transcription if available")
     parser.add_argument("--model-path", type=str, default="models/vosk-model-en-us-0.22-lgraph", 
                        help="Path to Vosk model directory")
+    parser.add_argument("--whisper", action="store_true", help="Use faster-whisper transcription instead of Vosk")
     args = parser.parse_args()
 
     if args.session:
@@ -365,7 +621,7 @@ if __name__ == "__main__":
         sd = os.path.join(RECORDINGS, sessions[-1])
 
     print("Analyzing", sd)
-    wf = analyze_session(sd, use_vosk=args.vosk, model_path=args.model_path)
+    wf = analyze_session(sd, use_vosk=args.vosk, model_path=args.model_path, use_whisper=args.whisper)
     print("Saved workflow for", wf["session"])
     repeats = detect_repeats(RECORDINGS)
     if repeats:
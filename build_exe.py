@@ -21,6 +21,7 @@ PyInstaller.__main__.run([
     '--windowed',                       # GUI application (no console)
     '--icon=NONE',                      # Add icon if you have one
     '--add-data=models;models',         # Include Vosk models
+    '--add-data=prompts;prompts',       # Ollama system prompt
     '--hidden-import=PyQt6',
     '--hidden-import=PyQt6.QtCore',
     '--hidden-import=PyQt6.QtGui',
@@ -31,6 +32,7 @@ PyInstaller.__main__.run([
     '--hidden-import=PIL',
     '--hidden-import=PIL.Image',
     '--hidden-import=PIL.ImageGrab',
+    '--hidden-import=mss',
     '--hidden-import=pytesseract',
     '--hidden-import=vosk',
     '--hidden-import=sounddevice',
@@ -40,7 +42,7 @@ PyInstaller.__main__.run([
     '--hidden-import=cv2',
     '--hidden-import=numpy',
     '--hidden-import=pyautogui',
-    '--hidden-import=requests',
+    '--hidden-import=httpx',
     '--hidden-import=pygetwindow',
     '--collect-all=PyQt6',
     '--collect-all=vosk',
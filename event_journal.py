@@ -0,0 +1,23 @@
+"""
+Event journal helpers shared by the recorder and the analyzer.
+
+The recorder writes events.ndjson with a session_start header line carrying the
+wall-clock start (t0_wall); every event after it stores "ts" as integer ns
+since that start.
+"""
+
+
+def events_to_wall(events):
+    """
+    Turn events read from a journal into wall-clock form. The journal starts
+    with a session_start header carrying t0_wall, and event "ts" values are
+    integer ns since then; the header is dropped and each ts becomes epoch
+    seconds. Events from older recordings (float epoch ts, no header) are
+    returned unchanged.
+    """
+    if not events or events[0].get("type") != "session_start":
+        return events
+    t0 = events[0]["t0_wall"]
+    for event in events[1:]:
+        event["ts"] = t0 + event.get("ts", 0) / 1e9
+    return events[1:]
@@ -1074,7 +1074,7 @@ class FlowBotGUI(QMainWindow):
             session_id = session.name
             
             # Check what files exist
-            has_events = (session / "events.json").exists()
+            has_events = (session / "events.ndjson").exists() or (session / "events.json").exists()
             has_workflow = (Path("workflows") / f"workflow_{session_id}.json").exists()
             has_cleaned = (Path("clean_workflows") / f"cleaned_{session_id}.json").exists()
             has_analysis = (Path("clean_workflows/analysis") / f"analysis_cleaned_{session_id}.txt").exists()
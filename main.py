@@ -2,16 +2,60 @@ import threading
 import time
 import os
 import argparse
-import subprocess
+import functools
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from recorder import start_recording, stop_recording
-import analyzer
-from clean_workflow import clean_workflow
-from ollama_workflow_analyzer import analyze_workflow_with_ollama
 
 RECORDINGS_DIR = "recordings"
 WORKFLOW_DIR = "workflows"
 CLEAN_SCRIPT = "clean_workflow.py"
+# Sessions the watcher already analyzed, keyed by session id -> [events mtime, size]
+ANALYZED_INDEX = os.path.join(RECORDINGS_DIR, ".analyzed.json")
+# The events file must be this old before analysis so the recorder is done with it
+SETTLE_SECONDS = 2
+
+
+def _load_analyzed_index():
+    try:
+        with open(ANALYZED_INDEX, "rb") as f:
+            data = f.read()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_analyzed_index(seen):
+    """Write the index atomically so a crash never leaves it half-written."""
+    data = orjson.dumps(seen) if orjson is not None else json.dumps(seen).encode("utf-8")
+    tmp = ANALYZED_INDEX + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, ANALYZED_INDEX)
+
+
+# The analysis stack (OCR, speech models, LLM client) is only imported the first
+# time a session is actually analyzed, and then reused for the whole process.
+@functools.lru_cache(maxsize=1)
+def _get_analyzer():
+    import analyzer
+    return analyzer
+
+
+@functools.lru_cache(maxsize=1)
+def _get_clean_workflow():
+    from clean_workflow import clean_workflow
+    return clean_workflow
+
+
+@functools.lru_cache(maxsize=1)
+def _get_ollama_analyzer():
+    from ollama_workflow_analyzer import analyze_workflow_with_ollama
+    return analyze_workflow_with_ollama
 
 
 def run_clean_workflow(workflow_json_path):
@@ -22,7 +66,7 @@ def run_clean_workflow(workflow_json_path):
 
     print(f"[Cleaner] 🧹 Cleaning workflow file: {workflow_json_path}")
     try:
-        cleaned = clean_workflow(workflow_json_path)
+        cleaned = _get_clean_workflow()(workflow_json_path)
         print(f"[Cleaner] ✅ Cleaned workflow successfully.")
         
         # Extract session_id from cleaned workflow
@@ -34,7 +78,7 @@ def run_clean_workflow(workflow_json_path):
             
             if os.path.exists(cleaned_json_path):
                 print(f"\n[Cleaner] 🤖 Starting Ollama LLM analysis...")
-                analyze_workflow_with_ollama(cleaned_json_path)
+                _get_ollama_analyzer()(cleaned_json_path)
             else:
                 print(f"[Cleaner] ⚠️ Cleaned file not found at: {cleaned_json_path}")
         
@@ -43,14 +87,17 @@ def run_clean_workflow(workflow_json_path):
 
 
 def analyze_one(session_dir, use_vosk=False):
-    """Analyze a single recording session and trigger cleaning."""
+    """Analyze a single recording session and trigger cleaning.
+
+    Returns True if a workflow was produced for the session.
+    """
     try:
         print(f"[Analyzer] Processing {session_dir} ...")
-        wf = analyzer.analyze_session(session_dir, use_vosk=use_vosk)
+        wf = _get_analyzer().analyze_session(session_dir, use_vosk=use_vosk)
 
         if not wf or "session" not in wf:
             print("[Analyzer] ⚠️ No workflow returned.")
-            return
+            return False
 
         session_id = wf["session"]
         print(f"[Analyzer] ✅ Saved workflow for session: {session_id}")
@@ -61,14 +108,21 @@ def analyze_one(session_dir, use_vosk=False):
             run_clean_workflow(workflow_file)
         else:
             print(f"[Analyzer] ⚠️ Expected workflow file not found at: {workflow_file}")
+        return True
 
     except Exception as e:
         print(f"[Analyzer] ❌ Error analyzing session: {e}")
+        return False
 
 
 def analyzer_watcher(stop_event, use_vosk=False, poll_interval=2):
-    """Watches recordings/ and analyzes any new sessions found."""
-    seen = set()
+    """Watches recordings/ and analyzes any new sessions found.
+
+    Analyzed sessions are remembered in ANALYZED_INDEX across restarts and only
+    re-analyzed when their events file changes.
+    """
+    seen = _load_analyzed_index()
+    failed = {}
     while not stop_event.is_set():
         try:
             sessions = sorted([
@@ -78,13 +132,27 @@ def analyzer_watcher(stop_event, use_vosk=False, poll_interval=2):
         except FileNotFoundError:
             sessions = []
         for s in sessions:
-            if s in seen:
-                continue
             session_dir = os.path.join(RECORDINGS_DIR, s)
-            events_file = os.path.join(session_dir, "events.json")
-            if os.path.exists(events_file):
-                analyze_one(session_dir, use_vosk=use_vosk)
-                seen.add(s)
+            # events.ndjson only appears once the recorder has finished the session
+            events_file = os.path.join(session_dir, "events.ndjson")
+            if not os.path.exists(events_file):
+                events_file = os.path.join(session_dir, "events.json")
+            try:
+                st = os.stat(events_file)
+            except FileNotFoundError:
+                continue
+
+            stamp = [st.st_mtime, st.st_size]
+            if seen.get(s) == stamp or failed.get(s) == stamp:
+                continue
+            if time.time() - st.st_mtime < SETTLE_SECONDS:
+                continue  # recorder may still be flushing
+
+            if analyze_one(session_dir, use_vosk=use_vosk):
+                seen[s] = stamp
+                _save_analyzed_index(seen)
+            else:
+                failed[s] = stamp  # retried on the next run or once the file changes
         time.sleep(poll_interval)
 
 
@@ -127,13 +195,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="AGI Assistant main orchestrator")
     parser.add_argument("--mode", choices=["once", "continuous"], default="once",
                         help="once: record one session and analyze it; continuous: keep recording and auto-analyze")
-    parser.add_argument("--vosk", action="store_true", help="Enable Vosk transcription (offline)")
+    # 🔹 Vosk is on by default; --no-vosk disables it
+    parser.add_argument("--vosk", dest="vosk", action="store_true", default=True,
+                        help="Enable Vosk transcription (offline, default)")
+    parser.add_argument("--no-vosk", dest="vosk", action="store_false",
+                        help="Disable Vosk transcription")
     args = parser.parse_args()
 
-    # 🔹 Force Vosk as default unless explicitly disabled
-    use_vosk = True if not args.vosk else args.vosk
-
     if args.mode == "once":
-        interactive_record_once(use_vosk=use_vosk)
+        interactive_record_once(use_vosk=args.vosk)
     else:
-        continuous_mode(use_vosk=use_vosk)
+        continuous_mode(use_vosk=args.vosk)
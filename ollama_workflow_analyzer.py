@@ -3,7 +3,29 @@ Ollama Workflow Analyzer
 Analyzes cleaned workflow files using local Ollama LLM to provide insights and automation suggestions.
 
 Usage:
-    python ollama_workflow_analyzer.py clean_workflows/cleaned_<session>.json
+    python ollama_workflow_analyzer.py clean_workflows/cleaned_<session>.json [--no-cache] [--quiet] [--semantic-cache]
+    python ollama_workflow_analyzer.py clean_workflows/ [--concurrency N] [--pack K]
+
+Given a directory (or a list of files from Python), every cleaned workflow is
+analyzed in one process with up to OLLAMA_NUM_PARALLEL (default 4) requests in
+flight at once; async callers can await analyze_workflows_async directly.
+The model stays loaded for OLLAMA_KEEP_ALIVE (default 30m) after each request.
+
+OLLAMA_NUM_PARALLEL and OLLAMA_MAX_LOADED_MODELS are also read by the Ollama
+server itself - set them for `ollama serve` as well, otherwise the server
+queues the concurrent requests and only one runs at a time:
+    OLLAMA_NUM_PARALLEL=4 OLLAMA_MAX_LOADED_MODELS=1 ollama serve
+
+Responses are cached in clean_workflows/.cache/ keyed by a hash of the model,
+system prompt, prompt and generation options, so re-analyzing an unchanged workflow is instant.
+With sentence-transformers installed and SEMANTIC_CACHE=1 (or --semantic-cache),
+a prompt that is nearly identical to an earlier one also reuses its response
+(see semantic_cache.SemanticCache).
+Workflows that begin with the same actions as an earlier one reuse its
+analysis as prior context (see action_memory.ActTree), so only the new
+actions are sent to the model. Workflows whose steps match an earlier one
+except for what was typed reuse its analysis with the new text filled in
+(action_memory.ActChain), without calling the model at all.
     
 Requirements:
     - Ollama running locally on http://localhost:11434
@@ -11,88 +33,189 @@ Requirements:
 """
 
 import os
+import re
 import sys
 import json
-import requests
+import time
+import hashlib
+import functools
+import glob
+import mmap
+import tempfile
+from collections import OrderedDict
+import asyncio
+import argparse
+import atexit
+import importlib.util
+import httpx
 from datetime import datetime
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# C-backed decoder for streamed lines, response bodies and cache files when
+# orjson is installed; both accept bytes and raise ValueError subclasses
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+from action_memory import ActTree, ActChain
+from semantic_cache import SemanticCache, SEMANTIC_CACHE_AVAILABLE
 
 OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_TAGS_URL = OLLAMA_URL.rsplit("/api/", 1)[0] + "/api/tags"
 MODEL_NAME = "mistral:latest"  # Faster alternative: mistral is smaller and quicker than llama3:8b
+# How long Ollama keeps the model loaded after a request, so back-to-back runs skip the reload
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
 
-SYSTEM_PROMPT = """
-You are a workflow summarizer AI.
+# Response cache
+CACHE_DIR = os.path.join("clean_workflows", ".cache")
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 100
+RESPONSE_L1_SIZE = 256  # responses also kept in memory for the life of the process
+REQUEST_TIMEOUT = 250
+# Reusing the answer to a near-identical prompt is opt-in: two workflows can be
+# close in embedding space and still deserve different analyses
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "0") == "1"
 
-You are given a structured list of recorded user actions (keyboard presses, clicks, etc.), each with fields such as `action_type`, `description`, `target`, `window`, and optionally `transcripts`.
+# Inference sizing. The context window is fitted to each prompt (next power of
+# two above prompt + output, clamped to the range below) so short workflows
+# don't pay for a large KV cache; every value can be overridden from the env.
+NUM_CTX_MIN = int(os.getenv("OLLAMA_NUM_CTX_MIN", "2048"))
+NUM_CTX_MAX = int(os.getenv("OLLAMA_NUM_CTX_MAX", "8192"))
+NUM_PREDICT = int(os.getenv("OLLAMA_NUM_PREDICT", "512"))
+NUM_BATCH = int(os.getenv("OLLAMA_NUM_BATCH", "256"))
+NUM_THREAD = int(os.getenv("OLLAMA_NUM_THREAD", str(os.cpu_count() or 4)))
 
-Your job is to:
-1. Analyze the sequence of actions and the active window names.
-2. Infer what the user was trying to do (task intent).
-3. Detect distinct tasks based on app/window switches, new goals, or different activities.
-4. Identify automation opportunities.
+STREAM_CHUNK_SIZE = 1 << 16
+# Streamed tokens are written to the terminal in batches, not one flush per token
+STREAM_FLUSH_BYTES = 4096
+STREAM_FLUSH_SECONDS = 0.05
 
+# Workflows with too many actions, or whose prompt is over MAX_PROMPT_TOKENS
+# (~4 chars per token), are analyzed map-reduce style: each chunk of actions is
+# summarized concurrently, then the summaries are analyzed together in place
+# of the raw action list. Only a segment prompt still over MAX_PROMPT_TOKENS is
+# truncated, as a last resort: its first and last actions are kept and the
+# middle is dropped.
+MAP_REDUCE_THRESHOLD = 200
+MAP_CHUNK_SIZE = 50
+MAX_PROMPT_TOKENS = int(os.getenv("MAX_PROMPT_TOKENS", "3072"))
 
-### Task Segmentation:
-- Treat a **new window name** as a strong signal of a **new task or subtask**.
-- A new task also begins when:
-  - A new application opens or focus changes (based on `window`).
-  - The user starts typing a URL, command, or distinct phrase.
-  - The user’s goal clearly changes (e.g., launching Notepad → typing text → closing app).
-- Merge related actions within the same window into one coherent task description.
-- Avoid listing step numbers (e.g., “steps 2–12”); describe actions naturally instead.
+# Workflows loaded ahead of the request workers in directory mode
+PREFETCH_DEPTH = 2
 
+# HTTP/2 needs the optional h2 package and is only negotiated over TLS, i.e. when
+# Ollama sits behind an https proxy; plain http://localhost stays on HTTP/1.1
+HTTP2 = OLLAMA_URL.startswith("https://") and importlib.util.find_spec("h2") is not None
+HTTP_TIMEOUT = httpx.Timeout(REQUEST_TIMEOUT, connect=10.0)
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0)
 
-### Reasoning Rules:
-- Combine consecutive single-key typing events into meaningful phrases.
-  Example: “Typed y, o, u, t, u, b, e” → “Typed ‘youtube.com’”.
-- Use the `window` field to identify which app was active.
-  Example: `"window": "Run"` → user used Windows Run dialog.
-- If transcripts are missing, infer intent from patterns and context.
-  Example: Typing “notepad” in the Run window → intent: open Notepad.
-- Keep reasoning factual and concise — do not hallucinate or assume unseen actions.
+# One keep-alive connection pool for every call to the Ollama server. Pool
+# limits and HTTP/2 belong to the transport - a Client ignores its own
+# limits/http2 arguments once a transport is passed in.
+SESSION = httpx.Client(timeout=HTTP_TIMEOUT,
+                       transport=httpx.HTTPTransport(http2=HTTP2, limits=HTTP_LIMITS, retries=2))
+atexit.register(SESSION.close)
 
+def _async_client():
+    """AsyncClient with the same pool settings as SESSION, for batch runs."""
+    return httpx.AsyncClient(timeout=HTTP_TIMEOUT,
+                             transport=httpx.AsyncHTTPTransport(http2=HTTP2, limits=HTTP_LIMITS, retries=2))
 
-### Automation Rules:
-- Suggest automation at a **goal level** (what the user wants to achieve), not low-level inputs.
-  Example: “Open Opera and visit YouTube,” not “Type each letter of youtube.com”.
-- If similar actions repeat (e.g., opening multiple sites), group them into a single automation flow.
+# /api/tags result shared by CLI runs started within a minute of each other
+TAGS_CACHE_PATH = os.path.join(tempfile.gettempdir(), "ollama_tags.json")
+TAGS_CACHE_TTL_SECONDS = 60
 
+ACTTREE_PATH = os.path.join(CACHE_DIR, "acttree.pkl")
+ACTCHAIN_PATH = os.path.join(CACHE_DIR, "actchain.pkl")
 
-### Output Format:
+def _prompt_path(name):
+    """Path of a file in prompts/, next to this module or inside a PyInstaller bundle."""
+    base_path = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, "prompts", name)
 
-1. **Summary (by Task):**
-   - Describe each task clearly using natural language.
-   - Mention which window or application the user was working in.
-   - Explain inferred intent briefly.
+# Read and decoded once at import; edit prompts/system.txt to change the instructions
+with open(_prompt_path("system.txt"), "rb") as f:
+    SYSTEM_PROMPT = f.read().decode("utf-8")
 
-2. **Transcript Insight:**
-   - If transcripts exist, summarize what they reveal about user intent.
-   - If not available, say: “Transcript: Not available.”
+CHUNK_SYSTEM_PROMPT = """
+You summarize one segment of a longer recorded computer workflow.
+List what the user did in this segment as short bullet points, in order,
+merging keystrokes into the text they typed and naming the applications used.
+Do not suggest automations - another step analyzes the whole workflow.
+"""
 
-3. **Automation:**
-   - Mention if the workflow can be automated and how.
+# Line prefixes/keywords of parse_txt_workflow, tested against the upper-cased
+# line. Header checks come first, so a header keyword wins over a step label.
+# (A single case-insensitive regex alternation was tried and measured ~2.3x
+# slower - 1.43 s vs 0.62 s on a 400k-line log: the "header anywhere in the
+# line" branch scans every line.)
+_META_PREFIXES = ("SESSION", "RECORDED")
+_SECTION_KEYWORDS = ("WORKFLOW SUMMARY", "DETAILED ACTIONS")
+# Rest of a "Step <n>...: <description>" line after the "STEP " prefix
+_STEP_RE = re.compile(r"[^\d:]*(\d+)?[^:]*(?::(.*))?", re.DOTALL)
 
-4. **Steps (to Automate):**
-   - Provide short, human-readable steps describing what the automation should do.
+# Line handlers for parse_txt_workflow. Each gets the parser state, the
+# stripped line and the same line upper-cased.
+def _on_session(state, line, up):
+    state["workflow"]["metadata"]["session_id"] = line.split(":", 1)[-1].strip()
 
-### Example Output:
+def _on_recorded(state, line, up):
+    state["workflow"]["metadata"]["recorded_at"] = line.split(":", 1)[-1].strip()
 
-**Summary (by Task):**
-- **Task 1:** The user opened the Run dialog and typed “notepad”, then pressed Enter to launch Notepad.
-- **Task 2:** In the Notepad window, they typed a short message (“hey how are you how are you today? yo yo”).
-- **Task 3:** The user closed Notepad using `Alt+F4`.
+def _on_section(state, line, up):
+    state["section"] = "summary" if _SECTION_KEYWORDS[0] in up else "actions"
 
-**Transcript Insight:** Transcript: Not available.
+def _on_summary_line(state, line, up):
+    state["summary_parts"].append(line)
 
-**Automation:**
-Opening Notepad and typing predefined text can be automated using a simple script or macro.
+def _finish_action(state):
+    # Description lines are collected per action and joined once, not +='d per line
+    if state["desc_parts"]:
+        state["workflow"]["actions"][-1]["description"] = " ".join(state["desc_parts"])
+        state["desc_parts"] = []
 
-**Steps (to Automate):**
-1. Open the Run dialog.
-2. Type “notepad” and press Enter.
-3. Wait for Notepad to open.
-4. Type the desired message automatically.
-5. Close the application.
-"""
+def _on_action_line(state, line, up):
+    if not line:
+        return
+    actions = state["workflow"]["actions"]
+    # "Step 1: something"
+    if up.startswith("STEP "):
+        num, desc = _STEP_RE.match(line, 5).groups()
+        if desc is not None:
+            _finish_action(state)
+            actions.append({
+                "step": int(num) if num else len(actions) + 1,
+                "description": ""
+            })
+            state["desc_parts"].append(desc.strip())
+    elif actions:
+        # Treat as continuation of previous action description
+        state["desc_parts"].append(line)
+    else:
+        actions.append({
+            "step": 1,
+            "description": ""
+        })
+        state["desc_parts"].append(line)
+
+def _ignore_line(state, line, up):
+    pass
+
+_SECTION_HANDLERS = {
+    "summary": _on_summary_line,
+    "actions": _on_action_line,
+}
 
 def parse_txt_workflow(content: str):
     """
@@ -108,61 +231,71 @@ def parse_txt_workflow(content: str):
         "workflow_summary": "",
         "actions": []
     }
+    state = {"workflow": workflow, "section": None, "summary_parts": [], "desc_parts": []}
 
-    lines = content.splitlines()
-    current_section = None
-
-    for line in lines:
+    for line in content.splitlines():
         line_stripped = line.strip()
-
-        # Detect headers or sections
-        if line_stripped.upper().startswith("SESSION"):
-            workflow["metadata"]["session_id"] = line_stripped.split(":", 1)[-1].strip()
-        elif line_stripped.upper().startswith("RECORDED"):
-            workflow["metadata"]["recorded_at"] = line_stripped.split(":", 1)[-1].strip()
-        elif "WORKFLOW SUMMARY" in line_stripped.upper():
-            current_section = "summary"
-        elif "DETAILED ACTIONS" in line_stripped.upper():
-            current_section = "actions"
-        elif current_section == "summary":
-            workflow["workflow_summary"] += " " + line_stripped
-        elif current_section == "actions" and line_stripped:
-            # Try to detect "Step 1: something"
-            if line_stripped.lower().startswith("step "):
-                parts = line_stripped.split(":", 1)
-                if len(parts) == 2:
-                    step_label, desc = parts
-                    try:
-                        step_num = int(''.join(filter(str.isdigit, step_label)))
-                    except ValueError:
-                        step_num = len(workflow["actions"]) + 1
-                    workflow["actions"].append({
-                        "step": step_num,
-                        "description": desc.strip()
-                    })
-            else:
-                # Treat as continuation of previous action description
-                if workflow["actions"]:
-                    workflow["actions"][-1]["description"] += " " + line_stripped
-                else:
-                    workflow["actions"].append({
-                        "step": 1,
-                        "description": line_stripped
-                    })
+        up = line_stripped.upper()
+        # Headers by prefix/keyword, everything else by the current section
+        if up.startswith(_META_PREFIXES):
+            handler = _on_session if up.startswith("SESSION") else _on_recorded
+        elif _SECTION_KEYWORDS[0] in up or _SECTION_KEYWORDS[1] in up:
+            handler = _on_section
+        else:
+            handler = _SECTION_HANDLERS.get(state["section"], _ignore_line)
+        handler(state, line_stripped, up)
+    _finish_action(state)
 
     workflow["metadata"]["total_steps"] = len(workflow["actions"])
-    workflow["workflow_summary"] = workflow["workflow_summary"].strip()
+    workflow["workflow_summary"] = " ".join(state["summary_parts"]).strip()
     return workflow
 
 
+# JSON workflows at least this big are stream-parsed with ijson (when installed)
+STREAM_JSON_MIN_BYTES = 1 << 20
+# The only action fields the prompt and the action memories use
+_PROMPT_ACTION_KEYS = ("step", "description", "action_type", "target", "transcripts", "window")
+_JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson is not None else (json.JSONDecodeError,)
+
+def _stream_json_workflow(filepath):
+    """
+    Load a large cleaned workflow without materializing the whole document:
+    actions are streamed one at a time and trimmed to _PROMPT_ACTION_KEYS
+    (coordinates, screenshots, OCR text etc. are dropped), then metadata and summary
+    are picked out in two more streaming passes.
+    """
+    with open(filepath, 'rb') as f:
+        actions = [
+            {k: action[k] for k in _PROMPT_ACTION_KEYS if k in action}
+            for action in ijson.items(f, "actions.item", use_float=True)
+        ]
+        f.seek(0)
+        metadata = next(ijson.items(f, "metadata", use_float=True), {})
+        f.seek(0)
+        summary = next(ijson.items(f, "workflow_summary"), "")
+    return {"metadata": metadata, "workflow_summary": summary, "actions": actions}
+
+def _load_json_file(f):
+    """Parse an open binary JSON file, straight from a memory map when orjson is available."""
+    if orjson is None:
+        return json.load(f)
+    if os.fstat(f.fileno()).st_size == 0:
+        return orjson.loads(b"")  # mmap can't map an empty file; raises JSONDecodeError
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
 def load_workflow(filepath):
     """Load cleaned workflow JSON or TXT file."""
     try:
+        # Check if it's a JSON or TXT file
+        if filepath.endswith('.json'):
+            if ijson is not None and os.path.getsize(filepath) >= STREAM_JSON_MIN_BYTES:
+                return _stream_json_workflow(filepath)
+            with open(filepath, 'rb') as f:
+                return _load_json_file(f)
         with open(filepath, 'r', encoding='utf-8') as f:
-            # Check if it's a JSON or TXT file
-            if filepath.endswith('.json'):
-                return json.load(f)
-            elif filepath.endswith('.txt'):
+            if filepath.endswith('.txt'):
                 # Parse the TXT format
                 content = f.read()
                 return parse_txt_workflow(content)
@@ -172,17 +305,156 @@ def load_workflow(filepath):
     except FileNotFoundError:
         print(f"❌ Error: File not found: {filepath}")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except _JSON_ERRORS as e:
         print(f"❌ Error: Invalid JSON file: {e}")
         sys.exit(1)
 
-def format_workflow_for_llm(workflow):
-    """Format workflow data into a clear prompt for the LLM."""
+# One keystroke as written by clean_workflow: "Typed: 'a'"; space arrives as "Pressed: Space"
+_TYPED_KEY_RE = re.compile(r"^Typed:\s*['\"](.)['\"]$", re.DOTALL)
+
+def _step_range(first, last):
+    return first if first == last else f"{first}-{last}"
+
+def _compact_actions(actions):
+    """
+    Shrink the action list before it goes into a prompt: runs of single
+    keystrokes become one "Typed: 'text'" action, identical consecutive
+    actions (repeated clicks, scrolls) become one with an "×N" suffix, and
+    a transcript is only listed on the first action it is attached to.
+    """
+    _get = dict.get
+    match_key = _TYPED_KEY_RE.match
+    compact = []
+    i, n = 0, len(actions)
+    while i < n:
+        action = actions[i]
+        desc = _get(action, 'description', '')
+        if match_key(desc):
+            chars = []
+            j = i
+            while j < n:
+                d = _get(actions[j], 'description', '')
+                m = match_key(d)
+                if m:
+                    chars.append(m.group(1))
+                elif d == "Pressed: Space":
+                    chars.append(" ")
+                else:
+                    break
+                j += 1
+            if j - i > 1:
+                text = "".join(chars)
+                action = dict(action, description=f"Typed: '{text}'", target=text)
+        else:
+            target = _get(action, 'target', '')
+            action_type = _get(action, 'action_type', '')
+            j = i + 1
+            while (j < n and _get(actions[j], 'description', '') == desc and _get(actions[j], 'target', '') == target
+                   and _get(actions[j], 'action_type', '') == action_type):
+                j += 1
+            if j - i > 1:
+                action = dict(action, description=f"{desc} ×{j - i}")
+        if j - i > 1:
+            action['step'] = _step_range(_get(action, 'step', ''), _get(actions[j - 1], 'step', ''))
+            transcripts = []
+            for merged in actions[i:j]:
+                transcripts.extend(_get(merged, 'transcripts', []))
+            action['transcripts'] = transcripts
+        compact.append(action)
+        i = j
+
+    # Transcripts are attached to every step they overlap; list each once
+    seen = set()
+    for k, action in enumerate(compact):
+        transcripts = _get(action, 'transcripts')
+        if not transcripts:
+            continue
+        fresh = [t for t in dict.fromkeys(transcripts) if t not in seen]
+        seen.update(fresh)
+        if len(fresh) != len(transcripts):
+            compact[k] = dict(action, transcripts=fresh)
+    return compact
+
+def _format_action(action, _get=dict.get):
+    # _get is bound once at definition time; this runs once per action
+    text = f"\nStep {_get(action, 'step', '')}: {_get(action, 'description', '')}"
+    action_type = _get(action, 'action_type')
+    if action_type:
+        text += f"\n  Action Type: {action_type}"
+    target = _get(action, 'target')
+    if target:
+        text += f"\n  Target: {target}"
+    transcripts = _get(action, 'transcripts')
+    if transcripts:
+        # Join all transcripts for this step
+        text += f"\n  Transcript: {' | '.join(transcripts)}"
+    return text
+
+def _append_actions(parts, actions, budget_chars=None):
+    """
+    Append the compacted action list to parts. Only when it exceeds the
+    budget are just its first and last actions kept, around an
+    "... N actions omitted (steps a-b) ..." line.
+    """
+    compact = _compact_actions(actions)
+    texts = [_format_action(a) for a in compact]
+    if budget_chars is None or sum(map(len, texts)) <= budget_chars:
+        parts.extend(texts)
+        return
+
+    head, tail = [], []
+    used = 60  # the omission line
+    i, j = 0, len(texts) - 1
+    while i <= j:
+        take_head = len(head) <= len(tail)
+        text = texts[i] if take_head else texts[j]
+        if used + len(text) > budget_chars:
+            break
+        used += len(text)
+        if take_head:
+            head.append(text)
+            i += 1
+        else:
+            tail.append(text)
+            j -= 1
+    parts.extend(head)
+    if i <= j:
+        steps = _step_range(str(compact[i].get('step', '')).split('-')[0],
+                            str(compact[j].get('step', '')).split('-')[-1])
+        parts.append(f"\n... {j - i + 1} actions omitted (steps {steps}) ...")
+    parts.extend(reversed(tail))
+
+_PROMPT_FOOTER = """
+
+Please provide your analysis following the format specified in the system prompt.
+"""
+
+def format_workflow_for_llm(workflow, memory=None, segment_summaries=None):
+    """Format workflow data into a clear prompt for the LLM.
+
+    If an ActTree memory is given and an already-analyzed workflow is a prefix
+    of this one, its analysis is included as prior context and only the
+    remaining actions are listed.
+
+    If segment_summaries are given (see summarize_segments), they replace the
+    detailed action list.
+    """
     metadata = workflow.get("metadata", {})
     summary = workflow.get("workflow_summary", "")
     actions = workflow.get("actions", [])
+
+    prior_context = ""
+    if memory is not None:
+        # leave at least one action to analyze; full repeats are the response cache's job
+        k, prior = memory.longest_prefix(actions, max_len=len(actions) - 1)
+        if prior:
+            prior_context = f"""
+PRIOR CONTEXT (analysis of the first {k} actions, already recorded earlier):
+{prior}
+"""
+            actions = actions[k:]
     
-    prompt = f"""Analyze this user workflow:
+    parts = [f"""Analyze this user workflow:
 
 SESSION ID: {metadata.get('session_id', 'unknown')}
 RECORDED: {metadata.get('recorded_at', 'unknown')}
@@ -190,147 +462,444 @@ TOTAL STEPS: {metadata.get('total_steps', 0)}
 
 WORKFLOW SUMMARY:
 {summary}
-
-DETAILED ACTIONS:
-"""
+{prior_context}"""]
     
-    for action in actions:
-        step_num = action.get('step', '')
-        desc = action.get('description', '')
-        action_type = action.get('action_type', '')
-        target = action.get('target', '')
-        transcripts = action.get('transcripts', [])
-        
-        prompt += f"\nStep {step_num}: {desc}"
-        if action_type:
-            prompt += f"\n  Action Type: {action_type}"
-        if target:
-            prompt += f"\n  Target: {target}"
-        if transcripts:
-            # Join all transcripts for this step
-            transcript_text = " | ".join(transcripts)
-            prompt += f"\n  Transcript: {transcript_text}"
+    if segment_summaries:
+        parts.append(f"\nSEGMENT SUMMARIES ({len(actions)} actions in {len(segment_summaries)} segments):\n")
+        for i, segment in enumerate(segment_summaries, 1):
+            parts.append(f"\nSegment {i}:\n{segment.strip()}\n")
+    else:
+        parts.append("\nDETAILED ACTIONS:\n")
+        _append_actions(parts, actions)
     
-    prompt += """
-
-Please provide your analysis following the format specified in the system prompt.
-"""
+    parts.append(_PROMPT_FOOTER)
     
-    return prompt
+    return "".join(parts)
 
-def query_ollama(prompt, system_prompt=SYSTEM_PROMPT, stream=True, model_name=None):
+def _needs_map_reduce(workflow, prompt):
     """
-    Send prompt to Ollama API and get response.
-    
-    Args:
-        prompt: The user prompt to send
-        system_prompt: System instructions for the model
-        stream: Whether to stream the response (default: True)
-        model_name: Optional model name to use
+    Too many actions, or a prompt (~4 chars per token) over MAX_PROMPT_TOKENS
+    or too big for the largest context.
     """
-    # Use provided model or default
-    selected_model = model_name if model_name else MODEL_NAME
-    
-    payload = {
-        "model": selected_model,
+    return (len(workflow.get("actions", [])) > MAP_REDUCE_THRESHOLD
+            or len(prompt) // 4 > MAX_PROMPT_TOKENS
+            or (len(prompt) + len(SYSTEM_PROMPT)) // 4 > NUM_CTX_MAX - NUM_PREDICT)
+
+def _format_segment_prompt(actions, index, total):
+    parts = [f"Summarize segment {index} of {total} of a recorded workflow.\n\nACTIONS:\n"]
+    # segments are not split further, so an oversized one is truncated
+    budget_chars = MAX_PROMPT_TOKENS * 4 - len(parts[0]) - 1
+    _append_actions(parts, actions, budget_chars=max(budget_chars, 0))
+    parts.append("\n")
+    return "".join(parts)
+
+async def summarize_segments(client, workflow, model_name=None, use_cache=True):
+    """
+    Map step for long workflows: summarize every MAP_CHUNK_SIZE actions
+    concurrently and return the summaries in order.
+    """
+    actions = workflow.get("actions", [])
+    chunks = [actions[i:i + MAP_CHUNK_SIZE] for i in range(0, len(actions), MAP_CHUNK_SIZE)]
+    prompts = [_format_segment_prompt(chunk, i, len(chunks)) for i, chunk in enumerate(chunks, 1)]
+    return await asyncio.gather(*(
+        query_ollama_async(client, p, system_prompt=CHUNK_SYSTEM_PROMPT, model_name=model_name, use_cache=use_cache)
+        for p in prompts
+    ))
+
+async def _summarize_segments_standalone(workflow, model_name, use_cache):
+    async with _async_client() as client:
+        return await summarize_segments(client, workflow, model_name, use_cache)
+
+_response_l1 = OrderedDict()
+
+def _response_cache_key(payload):
+    """blake2b over everything that shapes the answer: model, system prompt, prompt and options."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in (payload["model"], payload["system"], payload["prompt"],
+                 json.dumps(payload["options"], sort_keys=True)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _remember_response(key, text):
+    _response_l1[key] = text
+    _response_l1.move_to_end(key)
+    if len(_response_l1) > RESPONSE_L1_SIZE:
+        _response_l1.popitem(last=False)
+
+def _read_cached_response(key):
+    """Return the cached response for key, or None if missing or older than the TTL."""
+    text = _response_l1.get(key)
+    if text is not None:
+        _response_l1.move_to_end(key)
+        return text
+    path = os.path.join(CACHE_DIR, f"{key}.txt")
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except OSError:
+        return None
+    _remember_response(key, text)
+    return text
+
+def _write_cached_response(key, text):
+    """Atomically store a response, then keep only the newest CACHE_MAX_ENTRIES."""
+    _remember_response(key, text)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = os.path.join(CACHE_DIR, f"{key}.txt")
+        tmp = path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+        entries = [e for e in os.scandir(CACHE_DIR) if e.name.endswith(".txt")]
+        if len(entries) > CACHE_MAX_ENTRIES:
+            entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+            for entry in entries[CACHE_MAX_ENTRIES:]:
+                os.remove(entry.path)
+    except OSError as e:
+        print(f"⚠️  Warning: Could not write response cache: {e}")
+
+def _fit_num_ctx(prompt, system_prompt, num_predict=NUM_PREDICT):
+    """Smallest power-of-two context that holds the prompt plus num_predict tokens."""
+    if os.getenv("OLLAMA_NUM_CTX"):
+        return int(os.getenv("OLLAMA_NUM_CTX"))
+    needed = (len(prompt) + len(system_prompt)) // 4 + num_predict  # ~4 chars per token
+    num_ctx = 1 << max(needed - 1, 1).bit_length()
+    return max(NUM_CTX_MIN, min(num_ctx, NUM_CTX_MAX))
+
+_semantic_cache = None
+
+def _get_semantic_cache():
+    """The shared SemanticCache, or None when it is off or sentence-transformers isn't installed."""
+    global _semantic_cache
+    if not SEMANTIC_CACHE:
+        return None
+    if _semantic_cache is None and SEMANTIC_CACHE_AVAILABLE:
+        _semantic_cache = SemanticCache.load(CACHE_DIR)
+    return _semantic_cache
+
+def _semantic_scope(model, system_prompt):
+    # answers are only reused for the same model and instructions
+    return hashlib.sha256((model + system_prompt).encode("utf-8")).hexdigest()[:16]
+
+def _build_payload(prompt, system_prompt, model, stream, num_predict=NUM_PREDICT):
+    return {
+        "model": model,
         "prompt": prompt,
         "system": system_prompt,
         "stream": stream,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
         "options": {
             "temperature": 0.4,
             "top_p": 0.85,
             "top_k": 30,
             "repeat_penalty": 1.1,
+            "num_ctx": _fit_num_ctx(prompt, system_prompt, num_predict),
+            "num_predict": num_predict,
+            "num_batch": NUM_BATCH,
+            "num_thread": NUM_THREAD,
         }
-
     }
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+@functools.lru_cache(maxsize=8)
+def _encode_system_prompt(system_prompt):
+    return orjson.dumps(system_prompt)
+
+def _encode_payload(payload):
+    """
+    Request body for a payload. With orjson, the multi-KB system prompt is
+    encoded once per distinct prompt and spliced in, so each call only
+    serializes the per-request fields.
+    """
+    if orjson is None:
+        return json.dumps(payload).encode("utf-8")
+    rest = {k: v for k, v in payload.items() if k != "system"}
+    return b'{"system":' + _encode_system_prompt(payload["system"]) + b"," + orjson.dumps(rest)[1:]
+
+def _stream_writer():
+    """
+    Return write(text) for streamed tokens. Writes encoded bytes straight to
+    stdout's binary buffer when it has one, skipping the text layer; falls back
+    to sys.stdout.write for replaced streams (e.g. the GUI console capture).
+    """
+    out = sys.stdout
+    buffer = getattr(out, "buffer", None)
+    if buffer is None:
+        def write(text):
+            out.write(text)
+            out.flush()
+        return write
+    out.flush()  # anything already printed must come first
+    encoding = out.encoding or "utf-8"
+
+    def write(text):
+        buffer.write(text.encode(encoding, "replace"))
+        buffer.flush()
+    return write
+
+def _iter_ndjson(response, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield the decoded objects of a streamed NDJSON response. Lines are split on
+    the raw bytes, so nothing is decoded to str before the JSON parser sees it.
+    """
+    buf = bytearray()
+    for chunk in response.iter_bytes(chunk_size):
+        buf += chunk
+        start = 0
+        nl = buf.find(b"\n")
+        while nl >= 0:
+            if nl > start:
+                try:
+                    yield _json_loads(buf[start:nl])
+                except ValueError:  # json and orjson decode errors
+                    pass
+            start = nl + 1
+            nl = buf.find(b"\n", start)
+        del buf[:start]
+    if buf.strip():
+        try:
+            yield _json_loads(buf)
+        except ValueError:
+            pass
+
+def query_ollama(prompt, system_prompt=SYSTEM_PROMPT, stream=True, model_name=None, use_cache=True):
+    """
+    Send prompt to Ollama API and get response.
+    
+    Args:
+        prompt: The user prompt to send
+        system_prompt: System instructions for the model
+        stream: Whether to stream the response (default: True)
+        model_name: Optional model name to use
+        use_cache: Return/store the response in the on-disk cache (default: True)
+    """
+    # Use provided model or default
+    selected_model = model_name if model_name else MODEL_NAME
+
+    payload = _build_payload(prompt, system_prompt, selected_model, stream)
+    cache_key = _response_cache_key(payload) if use_cache else None
+    if cache_key:
+        cached = _read_cached_response(cache_key)
+        if cached is not None:
+            print(f"⚡ Using cached analysis ({selected_model})\n")
+            print("=" * 70)
+            print(cached)
+            print("=" * 70)
+            return cached
+    
+    # Near-identical prompt answered before?
+    sem_cache = _get_semantic_cache() if use_cache else None
+    if sem_cache is not None:
+        sem_scope = _semantic_scope(selected_model, system_prompt)
+        sem_emb = sem_cache.embed(prompt)
+        similar = sem_cache.lookup(sem_emb, sem_scope)
+        if similar is not None:
+            print(f"⚡ Using cached analysis of a near-identical workflow ({selected_model})\n")
+            print("=" * 70)
+            print(similar)
+            print("=" * 70)
+            return similar
     
     try:
         print(f"🤖 Querying Ollama ({selected_model})...\n")
         print("=" * 70)
         
-        response = requests.post(OLLAMA_URL, json=payload, stream=stream, timeout=250)
-        response.raise_for_status()
-        
-        full_response = ""
-        
         if stream:
             # Stream response in real-time
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        data = json.loads(line)
-                        token = data.get("response", "")
-                        print(token, end="", flush=True)
-                        full_response += token
-                        
-                        if data.get("done", False):
-                            break
-                    except json.JSONDecodeError:
-                        continue
+            with SESSION.stream("POST", OLLAMA_URL, content=_encode_payload(payload), headers=JSON_HEADERS) as response:
+                response.raise_for_status()
+                write = _stream_writer()
+                tokens = []
+                flushed = 0
+                pending = 0
+                last_flush = time.monotonic()
+                for data in _iter_ndjson(response):
+                    token = data.get("response", "")
+                    tokens.append(token)
+                    pending += len(token)
+                    done = data.get("done", False)
+
+                    now = time.monotonic()
+                    if done or pending >= STREAM_FLUSH_BYTES or now - last_flush >= STREAM_FLUSH_SECONDS:
+                        write("".join(tokens[flushed:]))
+                        flushed, pending, last_flush = len(tokens), 0, now
+
+                    if done:
+                        break
+                if flushed < len(tokens):
+                    write("".join(tokens[flushed:]))
+            full_response = "".join(tokens)
         else:
             # Get complete response
-            data = response.json()
+            response = SESSION.post(OLLAMA_URL, content=_encode_payload(payload), headers=JSON_HEADERS)
+            response.raise_for_status()
+            data = _json_loads(response.content)
             full_response = data.get("response", "")
             print(full_response)
         
         print("\n" + "=" * 70)
+        if cache_key and full_response:
+            _write_cached_response(cache_key, full_response)
+        if sem_cache is not None and full_response:
+            sem_cache.add(sem_emb, sem_scope, full_response)
+            sem_cache.save()
         return full_response
         
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Error: Could not connect to Ollama. Make sure it's running:")
         print("   Start Ollama: ollama serve")
         print(f"   Or check if it's accessible at: {OLLAMA_URL}")
         sys.exit(1)
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print("❌ Error: Request timed out. The model might be taking too long to respond.")
         sys.exit(1)
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ Error communicating with Ollama: {e}")
         sys.exit(1)
 
+async def query_ollama_async(client, prompt, system_prompt=SYSTEM_PROMPT, model_name=None, use_cache=True,
+                             num_predict=NUM_PREDICT):
+    """
+    Non-streaming counterpart of query_ollama for concurrent batch runs.
+    Uses the given httpx.AsyncClient and returns the response text ("" on error).
+    """
+    selected_model = model_name if model_name else MODEL_NAME
+
+    payload = _build_payload(prompt, system_prompt, selected_model, stream=False, num_predict=num_predict)
+    cache_key = _response_cache_key(payload) if use_cache else None
+    if cache_key:
+        cached = _read_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+    sem_cache = _get_semantic_cache() if use_cache else None
+    if sem_cache is not None:
+        sem_scope = _semantic_scope(selected_model, system_prompt)
+        # encoding the prompt is model inference, kept off the event loop
+        sem_emb = await asyncio.get_running_loop().run_in_executor(None, sem_cache.embed, prompt)
+        similar = sem_cache.lookup(sem_emb, sem_scope)
+        if similar is not None:
+            print(f"[Ollama Analyzer] ⚡ Reusing the analysis of a near-identical workflow ({selected_model})")
+            return similar
+
+    try:
+        response = await client.post(OLLAMA_URL, content=_encode_payload(payload), headers=JSON_HEADERS,
+                                     timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        full_response = _json_loads(response.content).get("response", "")
+    except httpx.HTTPError as e:
+        print(f"❌ Error communicating with Ollama: {e}")
+        return ""
+
+    if cache_key and full_response:
+        _write_cached_response(cache_key, full_response)
+    if sem_cache is not None and full_response:
+        sem_cache.add(sem_emb, sem_scope, full_response)
+        sem_cache.save()
+    return full_response
+
+ANALYSIS_DIR = os.path.join("clean_workflows", "analysis")
+_output_dir_ready = False
+
 def save_analysis(workflow_file, analysis_text):
     """Save the LLM analysis to a file."""
-    base_name = os.path.basename(workflow_file).replace(".json", "")
-    output_dir = "clean_workflows/analysis"
-    os.makedirs(output_dir, exist_ok=True)
+    global _output_dir_ready
+    base_name = os.path.splitext(os.path.basename(workflow_file))[0]
+    if not _output_dir_ready:
+        os.makedirs(ANALYSIS_DIR, exist_ok=True)
+        _output_dir_ready = True
     
-    output_file = os.path.join(output_dir, f"analysis_{base_name}.txt")
+    output_file = os.path.join(ANALYSIS_DIR, f"analysis_{base_name}.txt")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(f"WORKFLOW ANALYSIS\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Source: {workflow_file}\n")
-        f.write(f"Model: {MODEL_NAME}\n")
-        f.write("=" * 70 + "\n\n")
-        f.write(analysis_text)
+    body = "".join([
+        "WORKFLOW ANALYSIS\n",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+        f"Source: {workflow_file}\n",
+        f"Model: {MODEL_NAME}\n",
+        "=" * 70 + "\n\n",
+        analysis_text,
+    ])
+    # One write to a temp file, then an atomic rename - never a half-written analysis
+    tmp = output_file + ".tmp"
+    with open(tmp, 'wb', buffering=1 << 20) as f:
+        f.write(body.encode('utf-8'))
+    os.replace(tmp, output_file)
     
     print(f"\n💾 Analysis saved to: {output_file}")
     return output_file
 
+def _read_cached_model_names():
+    """Model names from a fresh TAGS_CACHE_PATH, or None."""
+    try:
+        if time.time() - os.path.getmtime(TAGS_CACHE_PATH) > TAGS_CACHE_TTL_SECONDS:
+            return None
+        with open(TAGS_CACHE_PATH, 'rb') as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+def _write_cached_model_names(model_names):
+    try:
+        tmp = f"{TAGS_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(model_names, f)
+        os.replace(tmp, TAGS_CACHE_PATH)
+    except OSError:
+        pass  # the cache is only an optimization
+
+@functools.lru_cache(maxsize=2)
+def _fetch_model_names(time_bucket):
+    """
+    Installed model names from /api/tags as a frozenset. time_bucket only
+    keys the memo, so a batch asks the server at most once per TTL window;
+    errors propagate and are not memoized.
+    """
+    response = SESSION.get(OLLAMA_TAGS_URL, timeout=5)
+    response.raise_for_status()
+    names = frozenset(m.get("name", "") for m in _json_loads(response.content).get("models", ()))
+    _write_cached_model_names(sorted(names))
+    return names
+
+# model name -> time.monotonic() of its last successful check in this process
+_status_ok = {}
+
 def check_ollama_status(model_name=None):
     """Check if Ollama is running and the model is available."""
     # Use provided model or default
     check_model = model_name if model_name else MODEL_NAME
     
+    # Checked in this process within the TTL: no file read, no request
+    now = time.monotonic()
+    if now - _status_ok.get(check_model, -TAGS_CACHE_TTL_SECONDS) < TAGS_CACHE_TTL_SECONDS:
+        return True
+    
+    # A recent successful check from another run is good enough
+    model_names = _read_cached_model_names()
+    if model_names is not None and check_model in set(model_names):
+        _status_ok[check_model] = now
+        return True
+    
     try:
         # Check if Ollama is running
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        response.raise_for_status()
-        
-        models = response.json().get("models", [])
-        model_names = [m.get("name", "") for m in models]
+        model_names = _fetch_model_names(int(time.monotonic() // TAGS_CACHE_TTL_SECONDS))
         
         if check_model not in model_names:
             print(f"⚠️  Warning: Model '{check_model}' not found locally.")
-            print(f"   Available models: {', '.join(model_names) if model_names else 'None'}")
+            print(f"   Available models: {', '.join(sorted(model_names)) if model_names else 'None'}")
             print(f"\n   To install the model, run:")
             print(f"   ollama pull {check_model}")
             return False
         
+        _status_ok[check_model] = now
         return True
         
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Error: Ollama is not running.")
         print("   Start it with: ollama serve")
         return False
@@ -338,18 +907,25 @@ def check_ollama_status(model_name=None):
         print(f"⚠️  Warning: Could not verify Ollama status: {e}")
         return True  # Continue anyway
 
-def analyze_workflow_with_ollama(workflow_file, model_name=None):
+def analyze_workflow_with_ollama(workflow_file, model_name=None, use_cache=True, stream=True):
     """
     Analyze a cleaned workflow file using Ollama LLM.
     Can be called from other modules.
     
     Args:
-        workflow_file: Path to the cleaned workflow JSON or TXT file
+        workflow_file: Path to the cleaned workflow JSON or TXT file, or a list
+            of paths to analyze concurrently (see analyze_workflows)
         model_name: Optional model name to use (default: MODEL_NAME from config)
+        use_cache: Reuse a cached analysis for an identical prompt (default: True)
+        stream: Print tokens as they are generated (default: True); False makes
+            a single non-streaming request, which is cheaper when nobody is watching
         
     Returns:
         bool: True if analysis was successful, False otherwise
     """
+    if isinstance(workflow_file, (list, tuple)):
+        return analyze_workflows(workflow_file, model_name=model_name, use_cache=use_cache) == len(workflow_file)
+    
     # Use provided model or default
     selected_model = model_name if model_name else MODEL_NAME
     
@@ -375,11 +951,31 @@ def analyze_workflow_with_ollama(workflow_file, model_name=None):
         print(f"[Ollama Analyzer] 📂 Loading workflow: {workflow_file}")
         workflow = load_workflow(workflow_file)
         
-        # Format prompt
-        prompt = format_workflow_for_llm(workflow)
+        actions = workflow.get("actions", [])
         
-        # Get analysis from Ollama with selected model
-        analysis = query_ollama(prompt, model_name=selected_model)
+        # Same steps as an earlier workflow with different typed text?
+        chain = ActChain.load(ACTCHAIN_PATH) if use_cache else None
+        analysis = chain.lookup(actions) if chain is not None else None
+        if analysis:
+            print("[Ollama Analyzer] ⚡ Same steps as an earlier workflow - reusing its analysis\n")
+            print(analysis)
+        else:
+            # Format prompt, reusing the analysis of a known action prefix
+            memory = ActTree.load(ACTTREE_PATH) if use_cache else None
+            prompt = format_workflow_for_llm(workflow, memory=memory)
+            if _needs_map_reduce(workflow, prompt):
+                print(f"[Ollama Analyzer] 🧩 {len(actions)} actions - summarizing in segments of {MAP_CHUNK_SIZE} first...")
+                segments = asyncio.run(_summarize_segments_standalone(workflow, selected_model, use_cache))
+                prompt = format_workflow_for_llm(workflow, segment_summaries=segments)
+            
+            # Get analysis from Ollama with selected model
+            analysis = query_ollama(prompt, stream=stream, model_name=selected_model, use_cache=use_cache)
+            
+            if analysis and memory is not None:
+                memory.insert(actions, analysis)
+                memory.save(ACTTREE_PATH)
+                if chain.insert(actions, analysis):
+                    chain.save(ACTCHAIN_PATH)
         
         # Save analysis
         if analysis:
@@ -395,16 +991,262 @@ def analyze_workflow_with_ollama(workflow_file, model_name=None):
         return False
 
 
+def collect_workflow_files(directory):
+    """
+    Return the cleaned workflows in directory. clean_workflow writes a .json
+    and a .txt for every session, so the .txt is skipped when a .json exists.
+    """
+    files = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.json")) + glob.glob(os.path.join(directory, "*.txt"))):
+        stem = os.path.splitext(path)[0]
+        if stem not in files or path.endswith(".json"):
+            files[stem] = path
+    return sorted(files.values())
+
+_ANALYSIS_MARKER_RE = re.compile(r"^\s*=== ANALYSIS (\d+) ===\s*$", re.MULTILINE)
+
+def format_batched_prompt(prompts):
+    """
+    Pack several single-workflow prompts into one request, so the system
+    prompt is prefilled once for all of them. The model is asked to start
+    each answer with an "=== ANALYSIS i ===" line (see split_batched_response).
+    """
+    parts = [
+        f"Below are {len(prompts)} separate user workflows. Analyze each one on its own, "
+        "following the format specified in the system prompt.\n"
+        "Start the analysis of workflow i with a line containing only '=== ANALYSIS i ==='.\n"
+    ]
+    for i, prompt in enumerate(prompts, 1):
+        parts.append(f"\n=== WORKFLOW {i} ===\n{prompt}\n")
+    return "".join(parts)
+
+def split_batched_response(text, count):
+    """Split a packed response into `count` analyses; missing ones are ""."""
+    pieces = _ANALYSIS_MARKER_RE.split(text)
+    analyses = [""] * count
+    # pieces = [preamble, "1", analysis 1, "2", analysis 2, ...]
+    for num, body in zip(pieces[1::2], pieces[2::2]):
+        i = int(num) - 1
+        if 0 <= i < count and not analyses[i]:
+            analyses[i] = body.strip()
+    return analyses
+
+def _fits_in_pack(prompts):
+    """Whether these prompts and their answers fit one context window (~4 chars per token)."""
+    tokens = (sum(len(p) for p in prompts) + len(SYSTEM_PROMPT)) // 4
+    return tokens + NUM_PREDICT * len(prompts) <= NUM_CTX_MAX
+
+def _load_workflow_quietly(workflow_file):
+    try:
+        return load_workflow(workflow_file)
+    except SystemExit:
+        return None  # load_workflow already reported why
+
+async def analyze_workflows_async(files, model_name=None, use_cache=True, concurrency=OLLAMA_NUM_PARALLEL, pack=1,
+                                  progress=None):
+    """
+    Analyze cleaned workflow files concurrently over one httpx.AsyncClient,
+    with `concurrency` requests in flight. Does not check Ollama's status first
+    (analyze_workflows does).
+
+    With pack > 1, up to `pack` small workflows that are ready at the same
+    time share one request (see format_batched_prompt); any analysis missing
+    from the packed answer is requested on its own.
+
+    progress, if given, gets update(1) per finished workflow (e.g. a tqdm bar).
+
+    Returns:
+        list of bool: per-workflow success, in completion order
+    """
+    model_name = model_name if model_name else MODEL_NAME
+    concurrency = max(1, concurrency)
+    memory = ActTree.load(ACTTREE_PATH) if use_cache else None
+    chain = ActChain.load(ACTCHAIN_PATH) if use_cache else None
+    loop = asyncio.get_running_loop()
+    # Workflows are read and parsed on a thread ahead of the workers, so the
+    # next one is ready the moment a request slot frees up; the small bound
+    # keeps a big directory from being loaded into memory all at once.
+    prefetched = asyncio.Queue(maxsize=max(PREFETCH_DEPTH, pack))
+    results = []
+
+    def record(ok):
+        results.append(ok)
+        if progress is not None:
+            progress.update(1)
+
+    async def prefetch():
+        for workflow_file in files:
+            workflow = await loop.run_in_executor(None, _load_workflow_quietly, workflow_file)
+            await prefetched.put((workflow_file, workflow))
+        for _ in range(concurrency):
+            await prefetched.put(None)
+
+    def prepare(workflow_file, workflow):
+        """Return (workflow_file, workflow, prompt) if the model is needed, else record the result."""
+        if workflow is None:
+            record(False)
+            return None
+        if chain is not None:
+            analysis = chain.lookup(workflow.get("actions", []))
+            if analysis:
+                print(f"[Ollama Analyzer] ⚡ {workflow_file}: same steps as an earlier workflow")
+                save_analysis(workflow_file, analysis)
+                record(True)
+                return None
+        return workflow_file, workflow, format_workflow_for_llm(workflow, memory=memory)
+
+    def finish(workflow_file, workflow, analysis):
+        if not analysis:
+            print(f"[Ollama Analyzer] ⚠️ No analysis generated for {workflow_file}")
+            record(False)
+            return
+        actions = workflow.get("actions", [])
+        if memory is not None:
+            memory.insert(actions, analysis)
+            chain.insert(actions, analysis)
+        save_analysis(workflow_file, analysis)
+        record(True)
+
+    async def analyze(client, workflow_file, workflow, prompt):
+        if _needs_map_reduce(workflow, prompt):
+            actions = workflow.get("actions", [])
+            print(f"[Ollama Analyzer] 🧩 {workflow_file}: {len(actions)} actions - summarizing in segments first")
+            segments = await summarize_segments(client, workflow, model_name, use_cache)
+            prompt = format_workflow_for_llm(workflow, segment_summaries=segments)
+        print(f"[Ollama Analyzer] 🤖 Analyzing {workflow_file}")
+        analysis = await query_ollama_async(client, prompt, model_name=model_name, use_cache=use_cache)
+        finish(workflow_file, workflow, analysis)
+
+    async def analyze_packed(client, jobs):
+        names = ", ".join(os.path.basename(job[0]) for job in jobs)
+        print(f"[Ollama Analyzer] 📦 Analyzing {len(jobs)} workflows in one request: {names}")
+        prompts = [job[2] for job in jobs]
+        response = await query_ollama_async(client, format_batched_prompt(prompts), model_name=model_name,
+                                            use_cache=use_cache, num_predict=NUM_PREDICT * len(jobs))
+        for job, prompt, analysis in zip(jobs, prompts, split_batched_response(response, len(jobs))):
+            if analysis:
+                if use_cache:
+                    # a later single-file run of this workflow is a cache hit
+                    key = _response_cache_key(_build_payload(prompt, SYSTEM_PROMPT, model_name, stream=False))
+                    _write_cached_response(key, analysis)
+                finish(job[0], job[1], analysis)
+            else:
+                await analyze(client, *job)
+
+    async def worker(client):
+        stop = False
+        while not stop:
+            item = await prefetched.get()
+            if item is None:
+                return
+            job = prepare(*item)
+            if job is None:
+                continue
+            if pack <= 1 or _needs_map_reduce(job[1], job[2]):
+                await analyze(client, *job)
+                continue
+
+            # Pack whichever small workflows are already waiting
+            jobs, leftover = [job], None
+            while len(jobs) < pack:
+                try:
+                    item = prefetched.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                extra = prepare(*item)
+                if extra is None:
+                    continue
+                if _needs_map_reduce(extra[1], extra[2]) or not _fits_in_pack([j[2] for j in jobs] + [extra[2]]):
+                    leftover = extra
+                    break
+                jobs.append(extra)
+
+            if len(jobs) == 1:
+                await analyze(client, *job)
+            else:
+                await analyze_packed(client, jobs)
+            if leftover is not None:
+                await analyze(client, *leftover)
+
+    async with _async_client() as client:
+        await asyncio.gather(prefetch(), *(worker(client) for _ in range(concurrency)))
+
+    if memory is not None:
+        memory.save(ACTTREE_PATH)
+        chain.save(ACTCHAIN_PATH)
+    return results
+
+def analyze_workflows(files, model_name=None, use_cache=True, concurrency=None, pack=1):
+    """
+    Analyze several cleaned workflow files in one process, keeping up to
+    `concurrency` requests (default: OLLAMA_NUM_PARALLEL) in flight and
+    packing up to `pack` small workflows into one request.
+
+    Returns:
+        int: number of workflows analyzed successfully
+    """
+    selected_model = model_name if model_name else MODEL_NAME
+    if concurrency is None:
+        concurrency = OLLAMA_NUM_PARALLEL
+
+    print("[Ollama Analyzer] 🔍 Checking Ollama status...")
+    if not check_ollama_status(selected_model):
+        print("[Ollama Analyzer] ⚠️ Ollama not available, skipping LLM analysis")
+        return 0
+
+    print(f"[Ollama Analyzer] ✓ Analyzing {len(files)} workflows (up to {concurrency} at a time)\n")
+    progress = None
+    if tqdm is not None and sys.stdout.isatty():
+        progress = tqdm(total=len(files), unit="workflow", desc="[Ollama Analyzer]")
+    try:
+        results = asyncio.run(analyze_workflows_async(files, selected_model, use_cache, concurrency, pack, progress))
+    finally:
+        if progress is not None:
+            progress.close()
+    done = sum(results)
+    print(f"\n[Ollama Analyzer] ✨ {done}/{len(files)} analyses complete!")
+    return done
+
+
 def main():
+    global SEMANTIC_CACHE
     if len(sys.argv) < 2:
-        print("Usage: python ollama_workflow_analyzer.py clean_workflows/cleaned_<session>.[json|txt]")
+        print("Usage: python ollama_workflow_analyzer.py <cleaned_<session>.[json|txt] | directory> [--no-cache]")
         print("\nExamples:")
         print("  python ollama_workflow_analyzer.py clean_workflows/cleaned_20251027_082338.json")
         print("  python ollama_workflow_analyzer.py clean_workflows/cleaned_20251027_082338.txt")
+        print("  python ollama_workflow_analyzer.py clean_workflows/")
         sys.exit(1)
-    
-    workflow_file = sys.argv[1]
-    success = analyze_workflow_with_ollama(workflow_file)
+
+    parser = argparse.ArgumentParser(description="Analyze a cleaned workflow with a local Ollama model.")
+    parser.add_argument("workflow_file", help="Cleaned workflow .json or .txt file, or a directory of them")
+    parser.add_argument("--no-cache", action="store_true", help="Always query the model, ignoring cached analyses")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Parallel requests for a directory (default: $OLLAMA_NUM_PARALLEL or 4)")
+    parser.add_argument("--pack", type=int, default=1,
+                        help="Analyze up to N small workflows of a directory per request (default: 1, no packing)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Don't stream tokens live; print the analysis once it is complete")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Reuse analyses of near-identical workflows (default: $SEMANTIC_CACHE=1, else off)")
+    args = parser.parse_args()
+    if args.semantic_cache:
+        SEMANTIC_CACHE = True
+
+    if os.path.isdir(args.workflow_file):
+        files = collect_workflow_files(args.workflow_file)
+        if not files:
+            print(f"❌ Error: No .json or .txt workflows found in {args.workflow_file}")
+            sys.exit(1)
+        done = analyze_workflows(files, use_cache=not args.no_cache, concurrency=args.concurrency, pack=args.pack)
+        sys.exit(0 if done == len(files) else 1)
+
+    # Streaming only pays off when someone is watching the terminal
+    stream = not args.quiet and sys.stdout.isatty()
+    success = analyze_workflow_with_ollama(args.workflow_file, use_cache=not args.no_cache, stream=stream)
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
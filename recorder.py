@@ -4,16 +4,30 @@ Saves into recordings/<session_id>/
 
 Provides a Recorder class with start() and stop() so main.py can orchestrate it.
 """
-import os, time, json, threading
+import os, time, json, hashlib, queue, threading
+from collections import OrderedDict, deque
 from datetime import datetime
 from PIL import ImageGrab
 import numpy as np
 import sounddevice as sd
-import scipy.io.wavfile as wavfile
+import wave
 from pynput import mouse, keyboard
 from pynput.keyboard import Key
+from event_journal import events_to_wall
 import platform
 import cv2  # for efficient image processing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import mss
+except ImportError:
+    mss = None
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
 try:
     import pygetwindow as gw
     PYGETWINDOW_AVAILABLE = True
@@ -27,26 +41,137 @@ os.makedirs(OUT_DIR, exist_ok=True)
 
 # Screenshot configuration
 SCREENSHOT_INTERVAL = 1.0  # seconds between checks
-SCREENSHOT_DIFF_THRESHOLD = 30  # minimum average pixel difference to save
+# Minimum mean gray difference between DIFF_SIZE thumbnails to save. It was 30
+# when frames were compared at native resolution; INTER_AREA averaging leaves
+# solid changes (dialogs, app switches) about as strong but cuts shifted text
+# to ~0.4x (a scrolled 1920x1080 page of text: 22.9 native vs 8.7 thumbnail),
+# so 30 * 0.4 keeps the old sensitivity
+SCREENSHOT_DIFF_THRESHOLD = 12
 SCREENSHOT_FORCE_INTERVAL = 10  # force save every 10 seconds if no changes
+DIFF_SIZE = (320, 180)  # frames are compared at this size, not native resolution
+PNG_COMPRESSION = 1  # zlib level: far less CPU than the default, files barely larger
+SCREENSHOT_QUEUE_SIZE = 8  # frames waiting for the PNG writers; the oldest is dropped beyond this
+SCREENSHOT_WRITERS = 2  # cv2.imwrite releases the GIL, so two encoders run in parallel
+FRAME_CACHE_SIZE = 64  # recent event screenshots reused when the screen is identical
+MOVE_MIN_INTERVAL_NS = 20_000_000  # mouse moves closer together than this are dropped...
+MOVE_MIN_DISTANCE = 4  # ...as are moves of fewer pixels (Manhattan) than this
 
 AUDIO_SAMPLE_RATE = 16000
 
-def compute_frame_difference(frame1, frame2):
+# Modifier keys as bit flags; the held modifiers are one int, and their names
+# for a key_down event are a single lookup in MOD_NAMES
+MOD_CTRL, MOD_SHIFT, MOD_ALT, MOD_CMD = 1, 2, 4, 8
+MOD_BITS = {
+    Key.ctrl: MOD_CTRL, Key.ctrl_l: MOD_CTRL, Key.ctrl_r: MOD_CTRL,
+    Key.shift: MOD_SHIFT, Key.shift_l: MOD_SHIFT, Key.shift_r: MOD_SHIFT,
+    Key.alt: MOD_ALT, Key.alt_l: MOD_ALT, Key.alt_r: MOD_ALT, Key.alt_gr: MOD_ALT,
+    Key.cmd: MOD_CMD, Key.cmd_l: MOD_CMD, Key.cmd_r: MOD_CMD,  # Windows key / Command key
+}
+MOD_NAMES = tuple(
+    tuple(name for bit, name in ((MOD_CTRL, "ctrl"), (MOD_SHIFT, "shift"), (MOD_ALT, "alt"), (MOD_CMD, "cmd"))
+          if mask & bit)
+    for mask in range(16)
+)
+
+# Events are journaled one JSON object per line while recording; the journal is
+# renamed to EVENTS_FILE once the stop-period cleanup has run.
+EVENTS_FILE = "events.ndjson"
+EVENTS_JOURNAL_SUFFIX = ".part"
+EVENTS_FLUSH_BATCH = 256  # serialized events queued before a listener writes them itself
+
+
+def _dumps_event(event):
+    """Serialize a single event to one NDJSON line (bytes, newline-terminated)."""
+    if orjson is not None:
+        return orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _loads_event(line):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+# mss handles are bound to the thread that opened them (GDI on Windows), and
+# screenshots are taken from the worker and from the input listener threads
+_mss_local = threading.local()
+
+def grab_screen(bbox=None):
+    """
+    Capture the screen, or bbox (left, top, right, bottom) of it, as a BGRA
+    uint8 array of shape (height, width, 4). Uses mss when installed (native
+    capture APIs; its BGRA bytes are wrapped as-is, with no color conversion),
+    else PIL's ImageGrab.
+    """
+    if mss is not None:
+        sct = getattr(_mss_local, "sct", None)
+        if sct is None:
+            sct = _mss_local.sct = mss.mss()
+        shot = sct.grab(bbox if bbox else sct.monitors[1])
+        return np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+    img = ImageGrab.grab(bbox=bbox) if bbox else ImageGrab.grab()
+    return cv2.cvtColor(np.asarray(img.convert("RGB")), cv2.COLOR_RGB2BGRA)
+
+def diff_thumbnail(frame, out=None, scratch=None):
+    """
+    Downsample a grab_screen() frame to a DIFF_SIZE grayscale uint8 array. A
+    change detector doesn't need native resolution, and frames of different
+    window sizes become comparable.
+
+    out (DIFF_SIZE gray) and scratch (DIFF_SIZE BGRA) are optional buffers to
+    reuse instead of allocating new arrays.
+    """
+    small = cv2.resize(frame, DIFF_SIZE, dst=scratch, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGRA2GRAY, dst=out)
+
+def frame_digest(gray):
+    """
+    64-bit hash of a diff_thumbnail() array. Equal digests mean an unchanged
+    frame, so the pixel diff can be skipped.
+    """
+    return hashlib.blake2b(gray, digest_size=8).digest()
+
+def compute_frame_difference(gray1, gray2):
     """
-    Compute average pixel difference between two frames.
+    Compute average pixel difference between two diff_thumbnail() arrays.
     Returns difference value between 0-255.
     """
-    if frame1 is None or frame2 is None:
+    if gray1 is None or gray2 is None:
         return float('inf')  # Guarantee save if either frame is None
     
-    # Convert to grayscale numpy arrays for efficient comparison
-    gray1 = cv2.cvtColor(np.array(frame1), cv2.COLOR_RGB2GRAY)
-    gray2 = cv2.cvtColor(np.array(frame2), cv2.COLOR_RGB2GRAY)
-    
-    # Compute absolute difference and average
-    diff = np.mean(np.abs(gray2.astype(float) - gray1.astype(float)))
-    return diff
+    # sum of absolute differences in one vectorized pass, no diff image. Every
+    # thumbnail has the same DIFF_SIZE shape whatever the screen or window size,
+    # so there is no per-resolution kernel to specialize or compile here
+    return cv2.norm(gray1, gray2, cv2.NORM_L1) / gray1.size
+
+
+class _WavWriter:
+    """Mono 16-bit PCM WAV written block by block (soundfile if installed, else wave)."""
+
+    def __init__(self, path, samplerate):
+        self.frames = 0
+        if sf is not None:
+            self._sf = sf.SoundFile(path, "w", samplerate, 1, "PCM_16")
+            self._wave = None
+        else:
+            self._sf = None
+            self._wave = wave.open(path, "wb")
+            self._wave.setnchannels(1)
+            self._wave.setsampwidth(2)
+            self._wave.setframerate(samplerate)
+
+    def write(self, data, frames):
+        """Append `frames` int16 samples given as a raw buffer (bytes, cffi buffer, ...)."""
+        if self._sf is not None:
+            self._sf.buffer_write(data, dtype="int16")
+        else:
+            # the header's frame count is patched once, on close
+            self._wave.writeframesraw(data)
+        self.frames += frames
+
+    def close(self):
+        (self._sf or self._wave).close()
 
 
 def _get_foreground_window_info():
@@ -95,29 +220,53 @@ class Recorder:
         # File for continuous audio recording
         self.audio_file = os.path.join(self.session_dir, "recording.wav")
 
-        self.events = []
+        # Events are streamed to disk as they happen instead of held in memory
+        self.events_file = os.path.join(self.session_dir, EVENTS_FILE)
+        self._events_journal = self.events_file + EVENTS_JOURNAL_SUFFIX
+        self._events_fp = None
+        # Listener threads only append serialized lines here; they are written
+        # to the journal in batches under _events_lock (each screenshot tick,
+        # once EVENTS_FLUSH_BATCH pile up, and at stop)
+        self._pending_events = deque()
+        self._events_lock = threading.Lock()
         self.recording_flag = {'on': False}
         self.screenshot_cutoff_time = None  # Time when screenshots should stop
-        self.audio_buffer = []
+
+        # Event timestamps are taken from the monotonic perf counter as integer
+        # ns offsets and written that way; the journal's session_start header
+        # holds the one wall-clock stamp that anchors them (see events_to_wall)
+        self._base_wall = time.time()
+        self._base_ns = time.perf_counter_ns()
+
+        # Audio blocks are written to audio_file as they arrive, not held in RAM
+        self._wav = None
+        self._audio_lock = threading.Lock()
 
         # Active window tracking
         self.last_active_window = None
         self.last_active_bbox = None
 
+        # Last recorded mouse_move, for rate limiting
+        self._last_move_ts = -MOVE_MIN_INTERVAL_NS
+        self._last_move_xy = (0, 0)
+
         # Screenshot state tracking
-        self.last_screenshot = None
+        self.last_screenshot_small = None  # diff_thumbnail() of the last saved frame
+        self._last_frame_digest = None     # frame_digest() of last_screenshot_small
         self.last_screenshot_time = 0
         self.screenshot_count = 0
         self._screenshot_lock = threading.Lock()
-
-        # Track currently pressed modifier keys
+        # full-frame hash -> path of an event screenshot already saved with those pixels
+        self._frame_cache = OrderedDict()
+        # PNG encoding + disk writes run on writer threads fed by this queue,
+        # so capture never waits on zlib or the disk
+        self._png_q = None
+        self._writer_threads = []
+
+        # Track currently pressed modifier keys; _modifier_mask is their
+        # MOD_BITS or-ed together, updated only when a modifier goes up or down
         self.pressed_modifiers = set()
-        self.modifier_keys = {
-            Key.ctrl, Key.ctrl_l, Key.ctrl_r,
-            Key.shift, Key.shift_l, Key.shift_r,
-            Key.alt, Key.alt_l, Key.alt_r, Key.alt_gr,
-            Key.cmd, Key.cmd_l, Key.cmd_r  # Windows key / Command key
-        }
+        self._modifier_mask = 0
 
         # Windows/apps to ignore (the recorder app itself)
         self.ignore_windows = [
@@ -128,9 +277,81 @@ class Recorder:
         ]
 
         self._threads = []
+        # Set by stop(); workers wait on it instead of sleeping, so they exit at once
+        self._stop_event = threading.Event()
         self._mouse_listener = None
         self._key_listener = None
     
+    def _now(self):
+        """Nanoseconds since the recording started (monotonic, no syscall-heavy wall clock)."""
+        return time.perf_counter_ns() - self._base_ns
+
+    def _record_event(self, event):
+        """Queue one event for the on-disk journal."""
+        if self._events_fp is None:
+            return
+        pending = self._pending_events
+        pending.append(_dumps_event(event))
+        if len(pending) >= EVENTS_FLUSH_BATCH:
+            self._flush_events()
+
+    def _flush_events(self):
+        """Write queued events to the journal in one call."""
+        pending = self._pending_events
+        with self._events_lock:
+            if self._events_fp is None or not pending:
+                return
+            batch = []
+            try:
+                while True:
+                    batch.append(pending.popleft())
+            except IndexError:
+                pass
+            self._events_fp.write(b"".join(batch))
+
+    def _save_screenshot(self, frame, path, event_type):
+        """
+        Queue a grab_screen() frame for the PNG writers. Callers hold
+        _screenshot_lock, so there is one producer at a time. When the writers
+        fall behind, this new frame is dropped rather than stalling capture and
+        False is returned: the caller must not journal path, since the frames
+        already queued belong to events that are on disk.
+        """
+        q = self._png_q
+        if q is None:
+            self._write_screenshot(frame, path)
+            return True
+        # frames are never modified after capture, so no copy is needed
+        try:
+            q.put_nowait((frame, path))
+        except queue.Full:
+            print(f"\033[33m[Screenshot]\033[0m Writer behind, {event_type} recorded without its screenshot")
+            return False
+        return True
+
+    def _png_writer(self):
+        q = self._png_q
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            self._write_screenshot(*item)
+
+    @staticmethod
+    def _write_screenshot(frame, path):
+        try:
+            # drop the alpha channel: mss leaves it unset on some platforms
+            bgr = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+            if not cv2.imwrite(path, bgr, [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]):
+                raise OSError("cv2.imwrite failed")
+        except Exception as e:
+            print(f"\033[31m[Error]\033[0m Failed to write {os.path.basename(path)}: {e}")
+
+    def _remember_frame(self, small):
+        """Make small (a diff_thumbnail()) the baseline for change detection."""
+        self.last_screenshot_small = small
+        self._last_frame_digest = frame_digest(small)
+
     def _should_ignore_window(self, window_title):
         """Check if the current window should be ignored from recording."""
         if not window_title:
@@ -150,11 +371,11 @@ class Recorder:
         except Exception:
             return None
 
-    def _capture_event_screenshot(self, ts, window_title=None):
+    def _capture_event_screenshot(self, ts, window_title=None, event_type="event"):
         """
         Capture and save a screenshot triggered by an event (click/keypress).
         Uses a lock to prevent concurrent screenshot saves.
-        Returns the path to the saved screenshot.
+        Returns the path to the saved screenshot, or None if it was dropped.
         Skips if we're in the cutoff period before stopping.
         Skips if window is in the ignore list (no need for screenshots of the app itself).
         """
@@ -172,15 +393,24 @@ class Recorder:
 
         with self._screenshot_lock:
             try:
-                if bbox:
-                    img = ImageGrab.grab(bbox=bbox)
-                else:
-                    img = ImageGrab.grab()
+                img = grab_screen(bbox)
+
+                # Same pixels as a recent capture (repeat clicks): point at that file
+                key = hashlib.blake2b(img, digest_size=16).digest() + repr(img.shape).encode()
+                cached = self._frame_cache.get(key)
+                if cached is not None:
+                    self._frame_cache.move_to_end(key)
+                    print(f"\033[90m[Screenshot]\033[0m Unchanged, reusing {os.path.basename(cached)}")
+                    return cached
 
                 path = os.path.join(self.session_dir, f"screenshot_{self.screenshot_count:05d}.png")
-                img.save(path)
+                if not self._save_screenshot(img, path, event_type):
+                    return None
+                self._frame_cache[key] = path
+                if len(self._frame_cache) > FRAME_CACHE_SIZE:
+                    self._frame_cache.popitem(last=False)
                 self.screenshot_count += 1
-                self.last_screenshot = img
+                self._remember_frame(diff_thumbnail(img))
                 self.last_screenshot_time = ts
                 # remember last bbox used
                 if bbox:
@@ -202,15 +432,26 @@ class Recorder:
         4. Stops capturing screenshots when in cutoff period
         """
         last_force_save = 0
-        last_activity = time.time()
+
+        # Thumbnails are made in buffers owned by this thread: one scratch BGRA
+        # and two grays, one of which may be the saved baseline while the
+        # other takes the next tick's frame
+        w, h = DIFF_SIZE
+        scratch = np.empty((h, w, 4), np.uint8)
+        grays = (np.empty((h, w), np.uint8), np.empty((h, w), np.uint8))
+
+        def thumbnail(frame):
+            out = grays[1] if grays[0] is self.last_screenshot_small else grays[0]
+            return diff_thumbnail(frame, out=out, scratch=scratch)
         
         while self.recording_flag['on']:
-            ts = time.time()
+            self._flush_events()
+            ts = self._now()
             
             # Skip screenshots if we're in the cutoff period
             if self.screenshot_cutoff_time and ts >= self.screenshot_cutoff_time:
                 print(f"\033[90m[Screenshot]\033[0m Stopped capturing (cutoff period)\033[0m")
-                time.sleep(0.1)  # Quick sleep to avoid CPU spinning
+                self._stop_event.wait(0.1)  # Quick wait to avoid CPU spinning
                 continue
                 
             try:
@@ -224,51 +465,58 @@ class Recorder:
                     if self._should_ignore_window(active_title):
                         self.last_active_window = active_title
                         self.last_active_bbox = active_bbox
-                        time.sleep(self.screenshot_interval)
+                        self._stop_event.wait(self.screenshot_interval)
                         continue
                     
                     self.last_active_window = active_title
                     self.last_active_bbox = active_bbox
                     with self._screenshot_lock:
                         # capture using active bbox when possible
-                        if active_bbox:
-                            frame = ImageGrab.grab(bbox=active_bbox)
-                        else:
-                            frame = ImageGrab.grab()
+                        frame = grab_screen(active_bbox)
                         path = os.path.join(self.session_dir, f"screenshot_{self.screenshot_count:05d}.png")
-                        frame.save(path)
-                        self.events.append({"ts": ts, "type": "window_change", "file": path, "window_title": active_title})
+                        if not self._save_screenshot(frame, path, "window_change"):
+                            # not journaled: retry the window change on the next tick
+                            self.last_active_window = None
+                            self._stop_event.wait(self.screenshot_interval)
+                            continue
+                        self._record_event({"ts": ts, "type": "window_change", "file": path, "window_title": active_title})
                         self.screenshot_count += 1
-                        self.last_screenshot = frame
+                        self._remember_frame(thumbnail(frame))
                         self.last_screenshot_time = ts
                         last_force_save = ts
                         print(f"\033[36m[Screenshot]\033[0m Window changed -> saved {os.path.basename(path)} ({active_title})")
                         # continue to next loop to avoid double-saving
-                        time.sleep(self.screenshot_interval)
+                        self._stop_event.wait(self.screenshot_interval)
                         continue
 
                 # Capture current frame for diff comparison (prefer active bbox)
-                if active_bbox:
-                    current_frame = ImageGrab.grab(bbox=active_bbox)
-                else:
-                    current_frame = ImageGrab.grab()
+                current_frame = grab_screen(active_bbox)
 
                 # Compute difference from last saved frame
-                diff = compute_frame_difference(self.last_screenshot, current_frame)
+                current_small = thumbnail(current_frame)
+                current_digest = frame_digest(current_small)
+                if current_digest == self._last_frame_digest:
+                    diff = 0.0  # identical to the last saved frame (idle desktop)
+                else:
+                    diff = compute_frame_difference(self.last_screenshot_small, current_small)
 
                 # Check conditions for saving
                 significant_change = diff >= SCREENSHOT_DIFF_THRESHOLD
-                time_since_last_save = ts - last_force_save
+                time_since_last_save = (ts - last_force_save) / 1e9
                 should_force_save = time_since_last_save >= SCREENSHOT_FORCE_INTERVAL
 
                 # Save if we detect changes or it's time for forced save
                 if significant_change or should_force_save:
                     with self._screenshot_lock:
                         path = os.path.join(self.session_dir, f"screenshot_{self.screenshot_count:05d}.png")
-                        current_frame.save(path)
-                        self.events.append({"ts": ts, "type": "screenshot", "file": path})
+                        if not self._save_screenshot(current_frame, path, "screenshot"):
+                            # baseline unchanged, so the next tick tries again
+                            self._stop_event.wait(self.screenshot_interval)
+                            continue
+                        self._record_event({"ts": ts, "type": "screenshot", "file": path})
                         self.screenshot_count += 1
-                        self.last_screenshot = current_frame
+                        self.last_screenshot_small = current_small
+                        self._last_frame_digest = current_digest
                         self.last_screenshot_time = ts
                         last_force_save = ts
 
@@ -283,57 +531,88 @@ class Recorder:
                 print(f"\033[31m[Error]\033[0m Screenshot error: {e}")
 
             # Sleep for the interval
-            time.sleep(self.screenshot_interval)
+            self._stop_event.wait(self.screenshot_interval)
 
     def _audio_worker(self):
+        # PortAudio delivers 16-bit samples already; they go to the file as raw
+        # bytes (the buffer is only valid during the callback, and the write copies it)
         def callback(indata, frames, time_info, status):
             if status:
                 print(f"Audio callback status: {status}")
-            # copy buffer frames to avoid referencing ephemeral memory
-            self.audio_buffer.append(indata.copy())
+            with self._audio_lock:
+                if self._wav is not None:
+                    try:
+                        self._wav.write(indata, frames)
+                    except Exception as e:
+                        print("Failed to write audio file:", e)
+                        wav, self._wav = self._wav, None
+                        try:
+                            wav.close()
+                        except Exception:
+                            pass
 
         try:
-            stream = sd.InputStream(samplerate=self.audio_sr, channels=1,
-                                    callback=callback, device=self.audio_device)
+            self._wav = _WavWriter(self.audio_file, self.audio_sr)
+            stream = sd.RawInputStream(samplerate=self.audio_sr, channels=1, dtype="int16",
+                                       callback=callback, device=self.audio_device)
             stream.start()
             print("Started audio recording...")
         except Exception as e:
             print("Audio input unavailable:", e)
+            self._finish_audio()
             return  # exit audio thread if audio can't start
 
         try:
             # Keep the stream running until recording is stopped
-            while self.recording_flag['on']:
-                time.sleep(0.1)  # Short sleep to prevent CPU hogging
-            
-            # When recording stops, save the complete buffer
-            if self.audio_buffer:
-                complete_audio = np.concatenate(self.audio_buffer, axis=0)
-                try:
-                    wavfile.write(self.audio_file, self.audio_sr, (complete_audio * 32767).astype('int16'))
-                    self.events.append({
-                        "ts": time.time(),
-                        "type": "audio_recording",
-                        "file": self.audio_file,
-                        "duration": len(complete_audio) / self.audio_sr
-                    })
-                    print(f"Saved audio recording ({len(complete_audio) / self.audio_sr:.1f} seconds)")
-                except Exception as e:
-                    print("Failed to write audio file:", e)
+            self._stop_event.wait()
         finally:
             try:
                 stream.stop()
                 print("Stopped audio recording.")
             except Exception:
                 pass
+            self._finish_audio()
+
+    def _finish_audio(self):
+        """Close the WAV file and journal it, or delete it if nothing was recorded."""
+        with self._audio_lock:
+            wav, self._wav = self._wav, None
+        if wav is None:
+            return
+        try:
+            wav.close()
+        except Exception as e:
+            print("Failed to write audio file:", e)
+            return
+        if not wav.frames:
+            try:
+                os.remove(self.audio_file)
+            except OSError:
+                pass
+            return
+        duration = wav.frames / self.audio_sr
+        self._record_event({
+            "ts": self._now(),
+            "type": "audio_recording",
+            "file": self.audio_file,
+            "duration": duration
+        })
+        print(f"Saved audio recording ({duration:.1f} seconds)")
 
     # input listeners
     def _on_move(self, x, y):
+        # pynput reports every pixel of motion; keep a move only once the
+        # pointer has travelled a few pixels and some time has passed
+        ts = self._now()
+        lx, ly = self._last_move_xy
+        if ts - self._last_move_ts < MOVE_MIN_INTERVAL_NS or abs(x - lx) + abs(y - ly) < MOVE_MIN_DISTANCE:
+            return
+        self._last_move_ts, self._last_move_xy = ts, (x, y)
         active_window, _ = _get_foreground_window_info()
-        self.events.append({"ts": time.time(), "type": "mouse_move", "x": x, "y": y, "window_title": active_window})
+        self._record_event({"ts": ts, "type": "mouse_move", "x": x, "y": y, "window_title": active_window})
 
     def _on_click(self, x, y, button, pressed):
-        ts = time.time()
+        ts = self._now()
         
         # Get active window title for context
         window_title, _ = _get_foreground_window_info()
@@ -347,16 +626,16 @@ class Recorder:
         
         # Take screenshot on mouse click (when pressed, not released)
         if pressed:
-            screenshot_path = self._capture_event_screenshot(ts, window_title)
+            screenshot_path = self._capture_event_screenshot(ts, window_title, "mouse_click")
             if screenshot_path:
                 event["screenshot"] = screenshot_path
                 print(f"\033[36m[Screenshot]\033[0m Captured on mouse click in: {window_title or 'Unknown'}")
                 
-        self.events.append(event)
+        self._record_event(event)
 
     def _on_scroll(self, x, y, dx, dy):
         window_title, _ = _get_foreground_window_info()
-        self.events.append({"ts": time.time(), "type": "mouse_scroll", "x": x, "y": y, "dx": dx, "dy": dy, "window_title": window_title})
+        self._record_event({"ts": self._now(), "type": "mouse_scroll", "x": x, "y": y, "dx": dx, "dy": dy, "window_title": window_title})
 
     def _get_key_string(self, key):
         """Convert key to string representation"""
@@ -365,44 +644,41 @@ class Recorder:
         except AttributeError:
             return str(key)
 
+    def _update_modifier_mask(self):
+        mask = 0
+        for key in self.pressed_modifiers:
+            mask |= MOD_BITS[key]
+        self._modifier_mask = mask
+
     def _on_press(self, key):
-        ts = time.time()
-        k = self._get_key_string(key)
-        
-        # Track modifier keys - UPDATE modifiers BEFORE recording the event
-        if key in self.modifier_keys:
+        ts = self._now()
+
+        # Track modifier keys, but DON'T record standalone modifier presses -
+        # they're just part of shortcuts
+        if key in MOD_BITS:
             self.pressed_modifiers.add(key)
+            self._update_modifier_mask()
+            return
+
+        k = self._get_key_string(key)
         
         # Get active window title for context
         window_title, _ = _get_foreground_window_info()
         
-        # Build modifiers string for the event
-        modifiers = []
-        if any(k in self.pressed_modifiers for k in [Key.ctrl, Key.ctrl_l, Key.ctrl_r]):
-            modifiers.append("ctrl")
-        if any(k in self.pressed_modifiers for k in [Key.shift, Key.shift_l, Key.shift_r]):
-            modifiers.append("shift")
-        if any(k in self.pressed_modifiers for k in [Key.alt, Key.alt_l, Key.alt_r, Key.alt_gr]):
-            modifiers.append("alt")
-        if any(k in self.pressed_modifiers for k in [Key.cmd, Key.cmd_l, Key.cmd_r]):
-            modifiers.append("cmd")
+        # Modifiers held for this key, e.g. ("ctrl", "shift")
+        modifiers = list(MOD_NAMES[self._modifier_mask])
 
         event = {
             "ts": ts,
             "type": "key_down",
             "key": k,
-            "modifiers": modifiers if modifiers else []
+            "modifiers": modifiers
         }
         
         # Add window title if available
         if window_title:
             event["window_title"] = window_title
 
-        # DON'T record standalone modifier key presses - they're just part of shortcuts
-        if key in self.modifier_keys:
-            # Skip recording this event - modifiers are tracked but not logged separately
-            return
-
         # Determine if this key press should capture a screenshot.
         # Capture when:
         #  - it's a special Key (e.g. Key.enter, Key.tab, Key.esc, Key.f1...)
@@ -414,28 +690,27 @@ class Recorder:
             capture_on_key = True
 
         if capture_on_key:
-            screenshot_path = self._capture_event_screenshot(ts, window_title)
+            screenshot_path = self._capture_event_screenshot(ts, window_title, f"key_down ({k})")
             if screenshot_path:
                 event["screenshot"] = screenshot_path
                 print(f"\033[36m[Screenshot]\033[0m Captured on key press ({k}) in: {window_title or 'Unknown'}")
 
         # Log keyboard shortcuts for debugging
-        if modifiers and key not in self.modifier_keys:
+        if modifiers:
             shortcut = "+".join(modifiers) + "+" + k
             print(f"\033[33m[Shortcut]\033[0m {shortcut} in: {window_title or 'Unknown'}")
 
-        self.events.append(event)
+        self._record_event(event)
 
     def _on_release(self, key):
-        k = self._get_key_string(key)
-        
         # Remove from pressed modifiers
-        if key in self.modifier_keys:
+        if key in MOD_BITS:
             self.pressed_modifiers.discard(key)
+            self._update_modifier_mask()
             # Don't record modifier releases either
             return
         
-        self.events.append({"ts": time.time(), "type": "key_up", "key": k})
+        self._record_event({"ts": self._now(), "type": "key_up", "key": self._get_key_string(key)})
 
     # --- public control ---
     def start(self, start_listeners=True):
@@ -443,6 +718,18 @@ class Recorder:
             print("Recorder already running.")
             return
         self.recording_flag['on'] = True
+        self._stop_event.clear()
+        self._base_wall = time.time()
+        self._base_ns = time.perf_counter_ns()
+        self._events_fp = open(self._events_journal, "wb", buffering=1 << 16)
+        self._events_fp.write(_dumps_event({"ts": 0, "type": "session_start", "t0_wall": self._base_wall}))
+        self._png_q = queue.Queue(maxsize=SCREENSHOT_QUEUE_SIZE)
+        self._writer_threads = [
+            threading.Thread(target=self._png_writer, name=f"screenshot-writer-{i}", daemon=True)
+            for i in range(SCREENSHOT_WRITERS)
+        ]
+        for t in self._writer_threads:
+            t.start()
 
         t_ss = threading.Thread(target=self._screenshot_worker, daemon=True)
         self._threads.append(t_ss)
@@ -468,7 +755,7 @@ class Recorder:
             return
         
         # Set cutoff time to prevent screenshots of the stop action
-        self.screenshot_cutoff_time = time.time()
+        self.screenshot_cutoff_time = self._now()
         print(f"\033[33m[Recorder]\033[0m Stopping screenshots (buffer: {self.stop_screenshot_buffer}s)")
         
         # Wait for the buffer period to pass
@@ -476,8 +763,11 @@ class Recorder:
         
         # Now stop recording completely
         self.recording_flag['on'] = False
-        # wait a short moment for threads to flush buffers
-        time.sleep(0.5)
+        self._stop_event.set()
+        # let the workers finish (the audio worker journals the recording on its way out)
+        for t in self._threads:
+            t.join(timeout=2.0)
+        self._threads = []
 
         # stop listeners
         try:
@@ -488,62 +778,90 @@ class Recorder:
         except Exception:
             pass
 
+        # let queued screenshots hit the disk before the cutoff cleanup looks for them
+        if self._png_q is not None:
+            with self._screenshot_lock:
+                q, self._png_q = self._png_q, None
+            for _ in self._writer_threads:
+                q.put(None)
+            for t in self._writer_threads:
+                t.join()
+            self._writer_threads = []
+
+        # close the journal; anything still firing after this point is dropped
+        self._flush_events()
+        with self._events_lock:
+            fp, self._events_fp = self._events_fp, None
+        if fp is not None:
+            fp.close()
+        self._pending_events.clear()
+
         # Filter out any screenshots/events that occurred after cutoff
         # BUT keep the audio_recording event which is essential
         cutoff_time = self.screenshot_cutoff_time
-        filtered_events = []
+        kept_events = 0
+        kept_files = set()  # event screenshots can be shared (see _frame_cache)
         removed_screenshots = []
         removed_clicks = 0
-        
-        for event in self.events:
-            # Always keep audio_recording events regardless of timestamp
-            if event.get('type') == 'audio_recording':
-                filtered_events.append(event)
-            elif event.get('ts', 0) < cutoff_time:
-                filtered_events.append(event)
-            else:
-                # Count removed clicks (the stop recording click)
-                if event.get('type') == 'mouse_click':
-                    removed_clicks += 1
-                
-                # Delete screenshot files that were captured during stop period
-                if event.get('type') == 'screenshot' and 'file' in event:
-                    try:
-                        if os.path.exists(event['file']):
-                            os.remove(event['file'])
-                            removed_screenshots.append(os.path.basename(event['file']))
-                    except Exception as e:
-                        print(f"\033[31m[Error]\033[0m Failed to delete late screenshot: {e}")
-                elif 'screenshot' in event:
-                    # Also remove screenshot references from other events
+
+        try:
+            with open(self._events_journal, "rb") as src, open(self.events_file, "wb", buffering=1 << 16) as dst:
+                for line in src:
+                    if not line.strip():
+                        continue
                     try:
-                        if os.path.exists(event['screenshot']):
-                            os.remove(event['screenshot'])
-                            removed_screenshots.append(os.path.basename(event['screenshot']))
-                    except Exception as e:
-                        print(f"\033[31m[Error]\033[0m Failed to delete event screenshot: {e}")
-        
-        self.events = filtered_events
-        
+                        event = _loads_event(line)
+                    except ValueError:
+                        continue  # unreadable line (e.g. the process died mid-write)
+
+                    # Always keep audio_recording events regardless of timestamp
+                    if event.get('type') == 'audio_recording' or event.get('ts', 0) < cutoff_time:
+                        dst.write(line if line.endswith(b"\n") else line + b"\n")
+                        kept_events += 1
+                        if 'screenshot' in event:
+                            kept_files.add(event['screenshot'])
+                        continue
+
+                    # Count removed clicks (the stop recording click)
+                    if event.get('type') == 'mouse_click':
+                        removed_clicks += 1
+
+                    # Delete screenshot files that were captured during stop period
+                    if event.get('type') == 'screenshot' and 'file' in event:
+                        try:
+                            if os.path.exists(event['file']):
+                                os.remove(event['file'])
+                                removed_screenshots.append(os.path.basename(event['file']))
+                        except Exception as e:
+                            print(f"\033[31m[Error]\033[0m Failed to delete late screenshot: {e}")
+                    elif 'screenshot' in event and event['screenshot'] not in kept_files:
+                        # Also remove screenshot references from other events
+                        try:
+                            if os.path.exists(event['screenshot']):
+                                os.remove(event['screenshot'])
+                                removed_screenshots.append(os.path.basename(event['screenshot']))
+                        except Exception as e:
+                            print(f"\033[31m[Error]\033[0m Failed to delete event screenshot: {e}")
+            os.remove(self._events_journal)
+            print(f"Saved session ({kept_events} events) to", self.session_dir)
+        except Exception as e:
+            print(f"Failed to save {EVENTS_FILE}:", e)
+
         if removed_clicks > 0:
             print(f"\033[33m[Cleanup]\033[0m Removed {removed_clicks} stop-recording click(s)")
-        
+
         if removed_screenshots:
             print(f"\033[33m[Cleanup]\033[0m Removed {len(removed_screenshots)} screenshot(s) from stop period")
 
-        # write events log
-        try:
-            with open(os.path.join(self.session_dir, "events.json"), "w") as f:
-                json.dump(self.events, f, indent=2)
-            print("Saved session to", self.session_dir)
-        except Exception as e:
-            print("Failed to save events.json:", e)
-
     def get_session_dir(self):
         return self.session_dir
 
     def get_events(self):
-        return list(self.events)  # return a copy
+        """Read back the saved events (only available once stop() has run)."""
+        if not os.path.exists(self.events_file):
+            return []
+        with open(self.events_file, "rb") as f:
+            return events_to_wall([_loads_event(line) for line in f if line.strip()])
 
 # Convenience functions for quick usage
 _recorder_singleton = None
@@ -0,0 +1,208 @@
+"""
+Semantic response cache: reuse an earlier LLM answer for a prompt that is
+almost the same as one already analyzed (same app, same window, slightly
+different typing), where the exact-match cache would miss.
+
+Prompts are embedded with a small sentence-transformers model; a stored
+response is returned when the cosine similarity to its prompt is at least
+SIMILARITY_THRESHOLD. Entries are scoped (e.g. by model + system prompt) so
+an answer is never reused across models or prompt formats.
+
+Files in the cache directory:
+    semcache.npz      - int8 embedding codes (one row per entry) and per-row scales
+    responses.jsonl   - one {"scope", "response", "last_used"} object per row
+
+Usage:
+    cache = SemanticCache.load("clean_workflows/.cache")
+    emb = cache.embed(prompt)
+    hit = cache.lookup(emb, scope)
+    ...
+    cache.add(emb, scope, response)
+    cache.save()
+
+Optional dependencies: numpy + sentence-transformers (required for the cache
+to be enabled at all), faiss (used once the cache holds many entries) and
+numba (compiled similarity kernel for the brute-force path).
+"""
+
+import os
+import json
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+SEMANTIC_CACHE_AVAILABLE = np is not None and SentenceTransformer is not None
+
+EMBED_MODEL = "all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.87"))
+MAX_ENTRIES = 10000          # least recently used entries are evicted beyond this
+FAISS_MIN_ENTRIES = 4096     # below this a plain matrix product is just as fast
+FAISS_CANDIDATES = 8         # nearest neighbours checked for a matching scope
+
+EMBEDDINGS_FILE = "semcache.npz"
+RESPONSES_FILE = "responses.jsonl"
+
+_encoder = None
+
+
+def quantize(vectors):
+    """
+    Quantize float vectors to int8 with one scale per row (max |v| maps to 127).
+    Returns (codes, scales) with codes (n, dim) int8 and scales (n,) float32.
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vectors / scales[:, None]).astype(np.int8)
+    return np.ascontiguousarray(codes), scales.astype(np.float32)
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cosine_sims(codes, scales, q, q_scale):
+        """int8 dot product of every row with q, int32 accumulation, rows split across threads."""
+        n, d = codes.shape
+        sims = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.int32(0)
+            for j in range(d):
+                acc += np.int32(codes[i, j]) * np.int32(q[j])
+            sims[i] = acc * scales[i] * q_scale
+        return sims
+else:
+    def _cosine_sims(codes, scales, q, q_scale):
+        return np.matmul(codes, q, dtype=np.int32) * scales * q_scale
+
+
+def _get_encoder():
+    global _encoder
+    if _encoder is None:
+        print(f"[Semantic Cache] Loading embedding model {EMBED_MODEL}...")
+        _encoder = SentenceTransformer(EMBED_MODEL)
+    return _encoder
+
+
+class SemanticCache:
+    """Embeddings of past prompts with their responses, searched by cosine similarity."""
+
+    def __init__(self, cache_dir, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.codes = None        # (n, dim) int8, quantized L2-normalized embeddings
+        self.scales = None       # (n,) float32, codes[i] * scales[i] ~ embedding i
+        self.entries = []        # parallel list of {"scope", "response", "last_used"}
+        self._index = None       # faiss index over embeddings, rebuilt lazily
+        self._dirty = False
+
+    @classmethod
+    def load(cls, cache_dir, **kwargs):
+        """Load the cache from cache_dir, or start empty if missing/unreadable."""
+        cache = cls(cache_dir, **kwargs)
+        try:
+            with np.load(os.path.join(cache_dir, EMBEDDINGS_FILE)) as data:
+                if "codes" in data:
+                    codes = np.ascontiguousarray(data["codes"], dtype=np.int8)
+                    scales = data["scales"].astype(np.float32, copy=False)
+                else:
+                    # float32 cache written before embeddings were quantized
+                    codes, scales = quantize(data["embeddings"])
+            with open(os.path.join(cache_dir, RESPONSES_FILE), "r", encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except (OSError, KeyError, ValueError):
+            return cache
+        if len(entries) == len(codes) == len(scales):
+            cache.codes, cache.scales, cache.entries = codes, scales, entries
+        return cache
+
+    def save(self):
+        """Write embeddings and responses if anything changed since the last save."""
+        if not self._dirty or self.codes is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        emb_path = os.path.join(self.cache_dir, EMBEDDINGS_FILE)
+        resp_path = os.path.join(self.cache_dir, RESPONSES_FILE)
+        # np.savez appends .npz unless the name already ends with it
+        tmp_emb = emb_path[:-len(".npz")] + ".tmp.npz"
+        np.savez(tmp_emb, codes=self.codes, scales=self.scales)
+        with open(resp_path + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in self.entries)
+        os.replace(tmp_emb, emb_path)
+        os.replace(resp_path + ".tmp", resp_path)
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def embed(self, text):
+        """Normalized float32 embedding of text."""
+        return _get_encoder().encode(text, normalize_embeddings=True).astype(np.float32, copy=False)
+
+    def _candidates(self, emb):
+        """Row indices to check, most similar first, with their similarities."""
+        n = len(self.entries)
+        if faiss is not None and n >= FAISS_MIN_ENTRIES:
+            if self._index is None:
+                vectors = self.codes.astype(np.float32) * self.scales[:, None]
+                self._index = faiss.IndexScalarQuantizer(
+                    vectors.shape[1], faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+                )
+                self._index.train(vectors)
+                self._index.add(vectors)
+            sims, rows = self._index.search(emb.reshape(1, -1).astype(np.float32), min(FAISS_CANDIDATES, n))
+            return rows[0], sims[0]
+        q_codes, q_scales = quantize(emb)
+        sims = _cosine_sims(self.codes, self.scales, q_codes[0], q_scales[0])
+        # only rows above the threshold can match, so only those get sorted
+        rows = np.flatnonzero(sims >= self.threshold)
+        rows = rows[np.argsort(sims[rows])[::-1]]
+        return rows, sims[rows]
+
+    def lookup(self, emb, scope):
+        """Return the response of the most similar prompt in scope, or None."""
+        if not self.entries:
+            return None
+        for row, sim in zip(*self._candidates(emb)):
+            if sim < self.threshold:
+                break
+            entry = self.entries[row]
+            if entry["scope"] == scope:
+                entry["last_used"] = time.time()
+                self._dirty = True
+                return entry["response"]
+        return None
+
+    def add(self, emb, scope, response):
+        """Store a response under its prompt embedding, evicting the LRU entries if full."""
+        codes, scales = quantize(emb)
+        if self.codes is None:
+            self.codes, self.scales = codes, scales
+        else:
+            self.codes = np.vstack([self.codes, codes])
+            self.scales = np.concatenate([self.scales, scales])
+        self.entries.append({"scope": scope, "response": response, "last_used": time.time()})
+        if len(self.entries) > self.max_entries:
+            keep = np.argsort([e["last_used"] for e in self.entries])[-self.max_entries:]
+            keep.sort()
+            self.codes, self.scales = self.codes[keep], self.scales[keep]
+            self.entries = [self.entries[i] for i in keep]
+        self._index = None
+        self._dirty = True
@@ -6,6 +6,7 @@ Verifies that all dependencies and requirements are met before launching the GUI
 import sys
 import subprocess
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 
 def check_python_version():
     """Check if Python version is 3.8 or higher"""
@@ -20,15 +21,15 @@ def check_python_version():
 def check_module(module_name, package_name=None):
     """Check if a Python module is installed"""
     package_name = package_name or module_name
-    spec = importlib.util.find_spec(module_name)
-    if spec is None:
+    # Already imported: no need to search sys.path for it
+    if module_name not in sys.modules and importlib.util.find_spec(module_name) is None:
         print(f"❌ {package_name} not installed")
         return False
     print(f"✅ {package_name}")
     return True
 
-def check_command(command, name):
-    """Check if a system command is available"""
+def _command_runs(command):
+    """Return True if `command --version` runs successfully"""
     try:
         result = subprocess.run(
             [command, '--version'],
@@ -36,31 +37,41 @@ def check_command(command, name):
             text=True,
             timeout=5
         )
-        if result.returncode == 0:
-            print(f"✅ {name}")
-            return True
+        return result.returncode == 0
     except (FileNotFoundError, subprocess.TimeoutExpired):
-        pass
+        return False
+
+def check_command(command, name, future=None):
+    """Check if a system command is available (future: a pending _command_runs result)"""
+    if future.result() if future is not None else _command_runs(command):
+        print(f"✅ {name}")
+        return True
     print(f"❌ {name} not found")
     return False
 
-def check_ollama():
-    """Check if Ollama is running"""
+def _ollama_model_names():
+    """Return the installed model names, or None if Ollama isn't reachable"""
     try:
-        import requests
-        response = requests.get("http://localhost:11434/api/tags", timeout=2)
+        import httpx
+        response = httpx.get("http://localhost:11434/api/tags", timeout=2)
         if response.status_code == 200:
             models = response.json().get("models", [])
-            model_names = [m.get("name", "") for m in models]
-            if "mistral:latest" in model_names or "llama3:8b" in model_names:
-                print("✅ Ollama running with models")
-                return True
-            else:
-                print("⚠️  Ollama running but no models found")
-                print("   Run: ollama pull mistral:latest")
-                return False
+            return [m.get("name", "") for m in models]
     except:
         pass
+    return None
+
+def check_ollama(future=None):
+    """Check if Ollama is running (future: a pending _ollama_model_names result)"""
+    model_names = future.result() if future is not None else _ollama_model_names()
+    if model_names is not None:
+        if "mistral:latest" in model_names or "llama3:8b" in model_names:
+            print("✅ Ollama running with models")
+            return True
+        else:
+            print("⚠️  Ollama running but no models found")
+            print("   Run: ollama pull mistral:latest")
+            return False
     print("❌ Ollama not running")
     print("   Start with: ollama serve")
     return False
@@ -71,6 +82,14 @@ def main():
     print("="*60 + "\n")
     
     all_good = True
+
+    # The slow checks (a subprocess with a 5 s timeout, an HTTP request with a
+    # 2 s one) start now and run while the others print; results are still
+    # reported in the usual order
+    pool = ThreadPoolExecutor(max_workers=2)
+    tesseract_check = pool.submit(_command_runs, "tesseract")
+    ollama_check = pool.submit(_ollama_model_names)
+    pool.shutdown(wait=False)
     
     # Check Python version
     print("Checking Python...")
@@ -87,7 +106,7 @@ def main():
         ("pytesseract", "pytesseract"),
         ("vosk", "vosk"),
         ("pyautogui", "pyautogui"),
-        ("requests", "requests"),
+        ("httpx", "httpx"),
     ]
     
     for module, package in required_packages:
@@ -97,14 +116,14 @@ def main():
     
     # Check system dependencies
     print("Checking system dependencies...")
-    if not check_command("tesseract", "Tesseract OCR"):
+    if not check_command("tesseract", "Tesseract OCR", tesseract_check):
         all_good = False
         print("   Install from: https://github.com/tesseract-ocr/tesseract")
     print()
     
     # Check Ollama
     print("Checking Ollama...")
-    ollama_ok = check_ollama()
+    ollama_ok = check_ollama(ollama_check)
     print()
     
     # Summary
@@ -0,0 +1,54 @@
+"""Change-region OCR in analyzer.load_session must not lose text of lines that
+only partly overlap the changed region."""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("pytesseract")
+
+import analyzer
+
+
+LINE_BOX = (10, 45, 390, 65)
+
+
+def test_widen_to_lines_covers_straddling_line():
+    lines = [(*LINE_BOX, "the quick brown fox jumps"), (10, 150, 100, 170, "footer")]
+    assert analyzer._widen_to_lines((150, 40, 175, 70), lines) == (10, 40, 390, 70)
+
+
+def test_widen_to_lines_leaves_disjoint_lines_alone():
+    lines = [(10, 150, 100, 170, "footer")]
+    assert analyzer._widen_to_lines((150, 40, 175, 70), lines) == (150, 40, 175, 70)
+
+
+def test_one_word_changed_in_long_line_keeps_whole_line(tmp_path, monkeypatch):
+    before, after = tmp_path / "a.png", tmp_path / "b.png"
+    before.write_bytes(b""), after.write_bytes(b"")
+    frame_a = np.zeros((200, 400), np.uint8)
+    frame_b = frame_a.copy()
+    frame_b[50:60, 150:170] = 255  # "brown" -> "BLACK"
+    frames = {str(before): frame_a, str(after): frame_b}
+
+    def fake_ocr_lines(gray):
+        # Stand-in for tesseract: the full line is only readable when the
+        # image handed over contains all of it
+        if gray is frame_a:
+            return [(*LINE_BOX, "the quick brown fox jumps")]
+        h, w = gray.shape
+        if w >= LINE_BOX[2] - LINE_BOX[0]:
+            return [(0, 5, w, h - 5, "the quick BLACK fox jumps")]
+        return [(0, 5, w, h - 5, "BLACK")]
+
+    events = [
+        {"ts": 1.0, "type": "screenshot", "file": str(before)},
+        {"ts": 2.0, "type": "screenshot", "file": str(after)},
+    ]
+    monkeypatch.setattr(analyzer, "_read_events", lambda session_dir: events)
+    monkeypatch.setattr(analyzer, "_load_ocr_gray", lambda path: frames[path])
+    monkeypatch.setattr(analyzer, "_ocr_lines", fake_ocr_lines)
+
+    _, ocr_cache = analyzer.load_session(str(tmp_path))
+
+    assert ocr_cache[str(before)] == "the quick brown fox jumps"
+    assert ocr_cache[str(after)] == "the quick BLACK fox jumps"